@@ -1,16 +1,62 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response, g
+from markupsafe import Markup
+import cProfile
+import click
+import hashlib
+import hmac
+import io
 import json
 import os
-import requests as http_requests
-from datetime import datetime, date
+import pstats
+import time
+from datetime import datetime, date, timedelta, timezone
+from werkzeug.http import http_date
+
+import hub
+import jobs
+import metrics
+import serialization
+import storage
+from cache import DataCache, FragmentCache
+from deadlines import DATE_RE, crossed_date, due_date
+from markdown_import import parse_decision_tracker
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "headcorn-tracker-2026")
 
 DATA_FILE = os.environ.get("DATA_FILE", "decisions.json")
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "")
+HISTORY_ROTATE = os.environ.get("HISTORY_ROTATE", "month")
+DATA_FORMAT = os.environ.get("DATA_FORMAT", "json")
+DATA_COMPRESSION = os.environ.get("DATA_COMPRESSION", "")
+HISTORY_COMPACT_AFTER_DAYS = int(os.environ.get("HISTORY_COMPACT_AFTER_DAYS", 0))
+HISTORY_RETENTION_DAYS = int(os.environ.get("HISTORY_RETENTION_DAYS", 0))
+HISTORY_API_LIMIT = int(os.environ.get("HISTORY_API_LIMIT", 200))
 
 CONTEXT_HUB_URL = os.environ.get("CONTEXT_HUB_URL", "https://tg-headboss-production.up.railway.app")
 CONTEXT_HUB_KEY = os.environ.get("CONTEXT_HUB_KEY", "")
+HUB_TIMEOUT = float(os.environ.get("HUB_TIMEOUT", 15))
+HUB_RETRIES = int(os.environ.get("HUB_RETRIES", 2))
+HUB_PUSH_WORKERS = int(os.environ.get("HUB_PUSH_WORKERS", 8))
+HUB_PUSH_SAVE_EVERY = int(os.environ.get("HUB_PUSH_SAVE_EVERY", 1))
+HUB_PULL_PAGE_SIZE = int(os.environ.get("HUB_PULL_PAGE_SIZE", 200))
+
+HUB_STATUS_TTL = int(os.environ.get("HUB_STATUS_TTL", 60))
+HUB_BREAKER_THRESHOLD = int(os.environ.get("HUB_BREAKER_THRESHOLD", 3))
+HUB_BREAKER_COOLDOWN = int(os.environ.get("HUB_BREAKER_COOLDOWN", 120))
+
+JOBS_FILE = os.environ.get("JOBS_FILE", os.path.join(os.path.dirname(DATA_FILE), "jobs.db"))
+SYNC_INTERVAL = int(os.environ.get("SYNC_INTERVAL", 0))
+
+PROFILE_KEY = os.environ.get("PROFILE_KEY", "")
+
+DEADLINE_AUTO_OVERDUE = os.environ.get("DEADLINE_AUTO_OVERDUE", "1") == "1"
+DEADLINE_TICK_INTERVAL = int(os.environ.get("DEADLINE_TICK_INTERVAL", 0))
+UPCOMING_DAYS = int(os.environ.get("UPCOMING_DAYS", 7))
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 500))
+
+DASHBOARD_PAGE_SIZE = int(os.environ.get("DASHBOARD_PAGE_SIZE", 50))
+FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", 256))
 
 STATUS_MAP = {
     "overdue": {"label": "Просрочено", "emoji": "🔴", "color": "#ef4444"},
@@ -47,50 +93,157 @@ LOCAL_STATUS_TO_HUB = {
     "deferred": "active", "no_deadline": "active",
 }
 
+BLOCK_PREFIX = {"structure": "S", "sales": "P", "coo": "C", "finance": "F", "ops": "O", "open": "Q"}
+
+store = storage.open_store(
+    DATA_FILE, STORAGE_BACKEND, HISTORY_ROTATE, serialization.Codec(DATA_FORMAT, DATA_COMPRESSION),
+)
+data_cache = DataCache(store)
+fragment_cache = FragmentCache(FRAGMENT_CACHE_SIZE)
+hub_client = hub.HubClient(
+    CONTEXT_HUB_URL, CONTEXT_HUB_KEY, timeout=HUB_TIMEOUT, retries=HUB_RETRIES,
+    pool_size=max(HUB_PUSH_WORKERS, 4),
+)
 
-def ensure_data_dir():
-    data_dir = os.path.dirname(DATA_FILE)
-    if data_dir and not os.path.exists(data_dir):
-        os.makedirs(data_dir, exist_ok=True)
+
+_initialized = False
+
+
+def ensure_initialized():
+    global _initialized
+    if _initialized:
+        return
+    if not store.exists():
+        store.save({"decisions": get_initial_decisions(), "history": []})
+    _initialized = True
 
 
 def load_data():
-    if not os.path.exists(DATA_FILE):
-        data = {"decisions": get_initial_decisions(), "history": []}
-        save_data(data)
-        return data
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Return the current data as a cached, read-only view."""
+    return current_snapshot().data()
 
 
-def save_data(data):
-    ensure_data_dir()
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+def current_snapshot():
+    ensure_initialized()
+    snapshot = data_cache.snapshot()
+    if DEADLINE_AUTO_OVERDUE and snapshot.deadlines.has_due(date.today().isoformat()):
+        try:
+            flip_overdue(snapshot)
+        except Exception as e:
+            print(f"[deadlines] Error: {e}")
+        snapshot = data_cache.snapshot()
+    return snapshot
 
 
-def hub_headers():
-    return {"Authorization": f"Bearer {CONTEXT_HUB_KEY}", "Content-Type": "application/json"}
+def save_data(data):
+    store.save(data)
+
+
+def run_tx(fn):
+    """Apply ``fn(tx)`` to the store in one write transaction."""
+    ensure_initialized()
+    return store.run(fn)
+
+
+def next_decision_id(tx, block):
+    n = tx.count(block) + 1
+    new_id = f"{BLOCK_PREFIX.get(block, 'X')}-{n:02d}"
+    while tx.get(new_id) is not None:
+        n += 1
+        new_id = f"{BLOCK_PREFIX.get(block, 'X')}-{n:02d}"
+    return new_id
+
+
+def flip_overdue(snapshot=None):
+    """Mark active decisions whose deadline or check date has passed as overdue.
+
+    A decision is flipped once per date crossing: ``overdue_for`` records the
+    date, and a decision set back to active is left alone until a later date
+    passes. Only decisions popped from the snapshot's deadline heap are
+    touched, all in one write; each is re-checked inside the transaction.
+    """
+    if snapshot is None:
+        ensure_initialized()
+        snapshot = data_cache.snapshot()
+    today = date.today().isoformat()
+    candidates = snapshot.deadlines.pop_due(today)
+    if not candidates:
+        return 0
+
+    def apply(tx):
+        flipped = 0
+        now = datetime.now().isoformat()
+        for decision_id in candidates:
+            dec = tx.get(decision_id)
+            if dec is None or dec.get("status") != "active":
+                continue
+            due = due_date(dec)
+            if not due or due >= today:
+                continue
+            tx.update(decision_id, {"status": "overdue", "overdue_for": crossed_date(dec, today)})
+            tx.append_history({
+                "action": "status_change",
+                "id": decision_id,
+                "from": "active",
+                "to": "overdue",
+                "timestamp": now,
+                "source": "deadline",
+            })
+            flipped += 1
+        return flipped
+
+    try:
+        return run_tx(apply)
+    except Exception:
+        snapshot.deadlines.restore(candidates)
+        raise
+
+
+def upcoming_decisions(snapshot, days=UPCOMING_DAYS):
+    """Open decisions with a deadline or check date in the next ``days`` days, soonest first."""
+    today = date.today()
+    soonest = {}
+    for day, decision_id, field in snapshot.deadlines.between(
+        today.isoformat(), (today + timedelta(days=days)).isoformat()
+    ):
+        soonest.setdefault(decision_id, (day, field))
+    result = []
+    for decision_id, (day, field) in soonest.items():
+        dec = snapshot.index.get(decision_id)
+        if dec is not None:
+            result.append((day, field, dec))
+    return result
+
+
+def dashboard_stats(index):
+    counts = index.stats()
+    stats = {"total": counts["total"]}
+    for status in ("overdue", "active", "done", "no_deadline", "deferred"):
+        stats[status] = counts.get(status, 0)
+    return stats
 
 
 def hub_get(path, params=None):
-    try:
-        r = http_requests.get(f"{CONTEXT_HUB_URL}{path}", headers=hub_headers(), params=params, timeout=15)
-        r.raise_for_status()
-        return r.json()
-    except Exception as e:
-        print(f"[Context Hub GET {path}] Error: {e}")
-        return None
+    return hub_client.get(path, params)
 
 
-def hub_post(path, payload):
-    try:
-        r = http_requests.post(f"{CONTEXT_HUB_URL}{path}", headers=hub_headers(), json=payload, timeout=15)
-        r.raise_for_status()
-        return r.json()
-    except Exception as e:
-        print(f"[Context Hub POST {path}] Error: {e}")
-        return None
+def hub_post(path, payload, endpoint=None):
+    return hub_client.post(path, payload, endpoint)
+
+
+def fetch_hub_status():
+    health = hub_get("/api/health")
+    if not (health and isinstance(health, dict) and health.get("status") == "ok"):
+        raise hub.HubError("Context Hub не отвечает")
+    stats_result = hub_get("/api/decisions/stats")
+    return {"stats": stats_result if isinstance(stats_result, dict) else {}}
+
+
+hub_status = hub.StatusCache(
+    fetch_hub_status,
+    ttl=HUB_STATUS_TTL,
+    breaker=hub.CircuitBreaker(HUB_BREAKER_THRESHOLD, HUB_BREAKER_COOLDOWN),
+)
 
 
 def hub_decision_to_local(hub_dec):
@@ -120,6 +273,7 @@ def hub_decision_to_local(hub_dec):
         "date_created": (hub_dec.get("createdAt") or "")[:10],
         "source": "Context Hub",
         "tags": hub_dec.get("tags", []),
+        "hub_status": hub_status,
     }
 
 
@@ -134,46 +288,135 @@ def local_to_hub_text(dec):
     return ". ".join(parts)
 
 
+def hub_changed_at(hub_dec):
+    return hub_dec.get("updatedAt") or hub_dec.get("createdAt") or ""
+
+
+PULL_FIELDS = ("decision", "responsible", "deadline", "check_date", "tags")
+
+
+def pull_changes(local, hub_dec):
+    """Fields of ``local`` that changed on the hub since the last pull."""
+    incoming = hub_decision_to_local(hub_dec)
+    changes = {
+        field: incoming[field] for field in PULL_FIELDS
+        if incoming[field] and incoming[field] != local.get(field)
+    }
+    # Local statuses do not round-trip (push never sends one, and overdue or
+    # deferred map to active), so the hub status is compared with the one seen
+    # at the last push or pull. Records from before hub_status only adopt it.
+    seen = local.get("hub_status")
+    if incoming["hub_status"] != seen:
+        changes["hub_status"] = incoming["hub_status"]
+        if seen is not None and incoming["status"] != local.get("status"):
+            changes["status"] = incoming["status"]
+    return changes
+
+
 def sync_pull():
-    """Pull decisions from Context Hub into local tracker."""
+    """Pull new and changed decisions from Context Hub into local tracker.
+
+    Walks every page changed since the stored ``pull_watermark`` and commits
+    each page as it arrives; the watermark advances only after a full walk.
+    """
     if not CONTEXT_HUB_KEY:
         return 0, "API ключ не настроен"
 
-    result = hub_get("/api/decisions", {"limit": 200})
-    if not result:
-        return 0, "Не удалось подключиться к Context Hub"
-
-    hub_decisions = result if isinstance(result, list) else result.get("decisions", result.get("data", []))
-    if not isinstance(hub_decisions, list):
-        return 0, f"Неожиданный формат ответа"
-
-    data = load_data()
-    existing_hub_ids = {d.get("hub_id") for d in data["decisions"] if d.get("hub_id")}
-    existing_titles = {d.get("decision", "").lower().strip() for d in data["decisions"]}
-
-    added = 0
-    for hub_dec in hub_decisions:
-        hub_id = hub_dec.get("id", "")
-        title = (hub_dec.get("title") or "").lower().strip()
-        if hub_id in existing_hub_ids or title in existing_titles:
-            continue
-        local = hub_decision_to_local(hub_dec)
-        block = local["block"]
-        prefix = {"structure": "S", "sales": "P", "coo": "C", "finance": "F", "ops": "O", "open": "Q"}
-        count = sum(1 for d in data["decisions"] if d["block"] == block) + 1
-        local["id"] = f"{prefix.get(block, 'X')}-{count:02d}"
-        data["decisions"].append(local)
-        added += 1
-
-    if added > 0:
-        data["history"].append({
-            "action": "sync_pull",
-            "count": added,
-            "timestamp": datetime.now().isoformat(),
-        })
-        save_data(data)
+    watermark = store.read_meta("pull_watermark")
+    params = {"updatedSince": watermark} if watermark else {}
+    newest = watermark or ""
+    added = updated = 0
+
+    def apply_page(tx, page):
+        page_added = page_updated = 0
+        for hub_dec in page:
+            hub_id = hub_dec.get("id", "")
+            local = tx.find_by_hub_id(hub_id) if hub_id else None
+            if local is not None:
+                changes = pull_changes(local, hub_dec)
+                if not changes:
+                    continue
+                old, new = tx.update(local["id"], changes)
+                if set(changes) == {"hub_status"}:
+                    continue
+                if old["status"] != new["status"]:
+                    tx.append_history({
+                        "action": "status_change",
+                        "id": new["id"],
+                        "from": old["status"],
+                        "to": new["status"],
+                        "source": "sync_pull",
+                        "timestamp": datetime.now().isoformat(),
+                    })
+                page_updated += 1
+                continue
+            if tx.has_title(hub_dec.get("title")):
+                continue
+            new = hub_decision_to_local(hub_dec)
+            new["id"] = next_decision_id(tx, new["block"])
+            tx.insert(new)
+            page_added += 1
+        return page_added, page_updated
 
-    return added, f"Загружено {added} новых решений из Context Hub"
+    try:
+        for page in hub.iter_pages(hub_client, "/api/decisions", params, page_size=HUB_PULL_PAGE_SIZE):
+            if watermark:
+                # Hubs that ignore updatedSince still send everything.
+                page = [h for h in page if not hub_changed_at(h) or hub_changed_at(h) >= watermark]
+            for h in page:
+                newest = max(newest, hub_changed_at(h))
+            if page:
+                page_added, page_updated = run_tx(lambda tx: apply_page(tx, page))
+                added += page_added
+                updated += page_updated
+    except hub.HubError as e:
+        return added + updated, str(e)
+
+    def finish(tx):
+        if newest:
+            tx.set_meta("pull_watermark", newest)
+        if added or updated:
+            tx.append_history({
+                "action": "sync_pull",
+                "count": added,
+                "updated": updated,
+                "timestamp": datetime.now().isoformat(),
+            })
+
+    run_tx(finish)
+    return added + updated, f"Загружено {added} новых и обновлено {updated} решений из Context Hub"
+
+
+def push_decision(dec):
+    """Run the extract -> draft -> confirm stages for one decision."""
+    raw_text = local_to_hub_text(dec)
+    extract_result = hub_post("/api/decisions/extract", {"text": raw_text})
+    if not extract_result or "extracted" not in extract_result:
+        return None
+
+    extracted = extract_result["extracted"]
+    extracted["responsible"] = dec.get("responsible") or extracted.get("responsible")
+    extracted["deadline"] = dec.get("deadline") or extracted.get("deadline")
+    extracted["domain"] = BLOCK_TO_DOMAIN.get(dec.get("block", "open"), "general")
+
+    draft_result = hub_post("/api/decisions/draft", {
+        "chatId": "cursor-tracker",
+        "userId": "kamilla",
+        "rawText": raw_text,
+        "extracted": extracted,
+        "missingFields": extract_result.get("missingFields", []),
+    })
+    if not draft_result or "draftId" not in draft_result:
+        return None
+
+    draft_id = draft_result["draftId"]
+    confirm_result = hub_post(f"/api/decisions/draft/{draft_id}/confirm", {
+        "userId": "kamilla",
+        "userName": "Камилла",
+    }, endpoint="/api/decisions/draft/{id}/confirm")
+    if confirm_result and confirm_result.get("id"):
+        return confirm_result["id"]
+    return None
 
 
 def sync_push():
@@ -181,48 +424,40 @@ def sync_push():
     if not CONTEXT_HUB_KEY:
         return 0, "API ключ не настроен"
 
-    data = load_data()
+    pending = [
+        dict(dec) for dec in load_data()["decisions"]
+        if not dec.get("hub_id") and dec.get("source") != "Context Hub"
+    ]
+    confirmed = {}
     pushed = 0
-    for dec in data["decisions"]:
-        if dec.get("hub_id") or dec.get("source") == "Context Hub":
-            continue
-
-        raw_text = local_to_hub_text(dec)
-        extract_result = hub_post("/api/decisions/extract", {"text": raw_text})
-        if not extract_result or "extracted" not in extract_result:
-            continue
-
-        extracted = extract_result["extracted"]
-        extracted["responsible"] = dec.get("responsible") or extracted.get("responsible")
-        extracted["deadline"] = dec.get("deadline") or extracted.get("deadline")
-        extracted["domain"] = BLOCK_TO_DOMAIN.get(dec.get("block", "open"), "general")
-
-        draft_result = hub_post("/api/decisions/draft", {
-            "chatId": "cursor-tracker",
-            "userId": "kamilla",
-            "rawText": raw_text,
-            "extracted": extracted,
-            "missingFields": extract_result.get("missingFields", []),
-        })
-        if not draft_result or "draftId" not in draft_result:
-            continue
-
-        draft_id = draft_result["draftId"]
-        confirm_result = hub_post(f"/api/decisions/draft/{draft_id}/confirm", {
-            "userId": "kamilla",
-            "userName": "Камилла",
-        })
-        if confirm_result and confirm_result.get("id"):
-            dec["hub_id"] = confirm_result["id"]
-            pushed += 1
+
+    def flush():
+        nonlocal pushed
+        batch = dict(confirmed)
+        confirmed.clear()
+        # A confirmed draft starts out active on the hub.
+        pushed += run_tx(lambda tx: sum(
+            1 for decision_id, hub_id in batch.items()
+            if tx.update(decision_id, {"hub_id": hub_id, "hub_status": "active"})
+        ))
+
+    def on_pushed(dec, hub_id):
+        # Record each hub_id as it lands so a failure later in the run
+        # does not push the same decision twice on the next sync.
+        confirmed[dec["id"]] = hub_id
+        if len(confirmed) >= HUB_PUSH_SAVE_EVERY:
+            flush()
+
+    hub.push_all(pending, push_decision, on_pushed, workers=HUB_PUSH_WORKERS)
+    if confirmed:
+        flush()
 
     if pushed > 0:
-        data["history"].append({
+        run_tx(lambda tx: tx.append_history({
             "action": "sync_push",
             "count": pushed,
             "timestamp": datetime.now().isoformat(),
-        })
-        save_data(data)
+        }))
 
     return pushed, f"Отправлено {pushed} решений в Context Hub"
 
@@ -259,60 +494,267 @@ def get_initial_decisions():
     ]
 
 
-@app.route("/")
-def index():
-    data = load_data()
-    decisions = data["decisions"]
-
-    stats = {
-        "total": len(decisions),
-        "overdue": sum(1 for d in decisions if d["status"] == "overdue"),
-        "active": sum(1 for d in decisions if d["status"] == "active"),
-        "done": sum(1 for d in decisions if d["status"] == "done"),
-        "no_deadline": sum(1 for d in decisions if d["status"] == "no_deadline"),
-        "deferred": sum(1 for d in decisions if d["status"] == "deferred"),
+def run_sync(action):
+    if action == "pull":
+        count, msg = sync_pull()
+    elif action == "push":
+        count, msg = sync_push()
+    else:
+        pull_count, pull_msg = sync_pull()
+        push_count, push_msg = sync_push()
+        count, msg = pull_count + push_count, f"{pull_msg}. {push_msg}"
+    return {"count": count, "message": msg}
+
+
+def history_maintenance():
+    """Compact old status changes and drop history past the retention window."""
+    now = datetime.now()
+    result = {"compacted": 0, "removed": 0}
+    if HISTORY_COMPACT_AFTER_DAYS > 0:
+        before = (now - timedelta(days=HISTORY_COMPACT_AFTER_DAYS)).isoformat()
+        result["compacted"] = store.history.compact(before)
+    if HISTORY_RETENTION_DAYS > 0:
+        before = (now - timedelta(days=HISTORY_RETENTION_DAYS)).isoformat()
+        result["removed"] = store.history.apply_retention(before)
+    return result
+
+
+@app.cli.command("history-maintenance")
+def history_maintenance_command():
+    """Compact and trim the decision history now."""
+    print(history_maintenance())
+
+
+SYNC_ACTIONS = ("pull", "push", "full")
+SYNC_JOB_LABELS = {"sync_pull": "⬇️ Загрузка", "sync_push": "⬆️ Отправка", "sync_full": "🔄 Полная"}
+
+job_handlers = {f"sync_{action}": (lambda action=action: run_sync(action)) for action in SYNC_ACTIONS}
+job_handlers["history_maintenance"] = history_maintenance
+job_handlers["deadline_tick"] = lambda: {"flipped": flip_overdue()}
+job_schedule = {"deadline_tick": DEADLINE_TICK_INTERVAL}
+if HISTORY_COMPACT_AFTER_DAYS > 0 or HISTORY_RETENTION_DAYS > 0:
+    job_schedule["history_maintenance"] = 24 * 3600
+if CONTEXT_HUB_KEY:
+    job_schedule["sync_full"] = SYNC_INTERVAL
+
+# Syncs rewrite the same decision records (push and full link hub ids, pull
+# applies hub changes), so only one of them may run at a time.
+job_queue = jobs.JobQueue(JOBS_FILE, lock_keys={kind: "sync" for kind in job_handlers if kind.startswith("sync_")})
+job_worker = jobs.JobWorker(job_queue, job_handlers, schedule=job_schedule)
+
+
+@app.before_request
+def start_job_worker():
+    # Scheduled jobs run in the web process only; started here rather than at
+    # import so that CLI commands do not spawn a worker.
+    if any(interval > 0 for interval in job_schedule.values()):
+        job_worker.ensure_running()
+
+
+def enqueue_sync(action):
+    job, created = job_queue.enqueue(f"sync_{action}")
+    job_worker.ensure_running()
+    job_worker.wake()
+    return job, created
+
+
+def job_response(job, created=False):
+    body = dict(job, created=created, status_url=url_for("api_sync_job", job_id=job["id"]))
+    return jsonify(body), 202 if job["status"] in jobs.ACTIVE_STATUSES else 200
+
+
+def profiling_requested():
+    if not PROFILE_KEY or not request.args.get("profile"):
+        return False
+    key = request.headers.get("X-Profile-Key") or request.args.get("profile_key", "")
+    # compare_digest only accepts ASCII str, so compare the encoded bytes.
+    return hmac.compare_digest(key.encode("utf-8"), PROFILE_KEY.encode("utf-8"))
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    if profiling_requested():
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+
+@app.after_request
+def record_request(response):
+    route = request.url_rule.rule if request.url_rule else "<unmatched>"
+    started = g.get("request_started")
+    if started is not None:
+        metrics.http_seconds.observe(time.perf_counter() - started, request.method, route, response.status_code)
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+        return Response(out.getvalue(), mimetype="text/plain")
+    return response
+
+
+@metrics.REGISTRY.gauge_collector
+def app_gauges():
+    cache = data_cache.stats()
+    try:
+        data_bytes = os.path.getsize(store.path)
+    except OSError:
+        data_bytes = None
+    return [
+        ("tracker_cache_hits", "Data cache hits since start.", {}, cache["hits"]),
+        ("tracker_cache_misses", "Data cache reloads since start.", {}, cache["misses"]),
+        ("tracker_cache_applied", "Commits applied to the cache incrementally.", {}, cache["applied"]),
+        ("tracker_cache_hit_ratio", "Data cache hit ratio.", {}, cache["hit_ratio"]),
+        ("tracker_fragment_cache_hits", "Rendered dashboard fragments served from memory.", {},
+         fragment_cache.hits),
+        ("tracker_fragment_cache_misses", "Rendered dashboard fragments rendered afresh.", {},
+         fragment_cache.misses),
+        ("tracker_data_file_bytes", "Size of the data file.", {}, data_bytes),
+        ("tracker_decisions", "Decisions in the cached snapshot.", {}, cache["decisions"]),
+        ("tracker_hub_breaker_open", "1 while the Context Hub circuit breaker is open.", {},
+         int(hub_status.breaker.state == "open")),
+    ]
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+def dashboard_filters():
+    """Dashboard filters from the query string, shared with the row fragments."""
+    return {
+        "block": request.args.get("block", "all"),
+        "status": request.args.get("status", "all"),
+        "q": request.args.get("q", "").strip(),
+        "upcoming": request.args.get("upcoming") == "1",
     }
 
-    filter_block = request.args.get("block", "all")
-    filter_status = request.args.get("status", "all")
 
-    filtered = decisions
-    if filter_block != "all":
-        filtered = [d for d in filtered if d["block"] == filter_block]
-    if filter_status != "all":
-        filtered = [d for d in filtered if d["status"] == filter_status]
+def page_number():
+    try:
+        return max(1, int(request.args.get("page", 1)))
+    except ValueError:
+        return 1
+
+
+def filter_args(filters, **extra):
+    args = {key: filters[key] for key in ("block", "status") if filters[key] != "all"}
+    if filters["q"]:
+        args["q"] = filters["q"]
+    if filters["upcoming"]:
+        args["upcoming"] = "1"
+    args.update(extra)
+    return args
+
+
+def dashboard_decisions(snapshot, filters):
+    ids = snapshot.search(filters["q"]) if filters["q"] else None
+    soonest = {}
+    if filters["upcoming"]:
+        soonest = {dec["id"]: day for day, _, dec in upcoming_decisions(snapshot)}
+        ids = set(soonest) if ids is None else ids & set(soonest)
+    decisions = snapshot.index.query(
+        block=None if filters["block"] == "all" else filters["block"],
+        status=None if filters["status"] == "all" else filters["status"],
+        ids=ids,
+    )
+    if filters["upcoming"]:
+        decisions.sort(key=lambda d: soonest[d["id"]])
+    return decisions
+
+
+def rows_page(snapshot, filters, page, lazy=False):
+    """One page of rendered table rows as ``{"html", "total", "count"}``.
+
+    ``lazy`` ends the page with a "show more" row that loads the next one in
+    place, for the block sections of the full dashboard; filtered views get
+    the pager instead. Plain block/status pages are cached under the block's
+    version, so an edit only invalidates the pages of the block it touched.
+    Search and upcoming views are rendered every time.
+    """
+    cacheable = filters["block"] != "all" and not filters["q"] and not filters["upcoming"]
+    if cacheable:
+        key = (snapshot.block_version(filters["block"]), filters["block"], filters["status"], page, DASHBOARD_PAGE_SIZE,
+               lazy)
+        fragment = fragment_cache.get(key)
+        if fragment is not None:
+            return fragment
+
+    decisions = dashboard_decisions(snapshot, filters)
+    start = (page - 1) * DASHBOARD_PAGE_SIZE
+    rows = decisions[start:start + DASHBOARD_PAGE_SIZE]
+    remaining = len(decisions) - start - len(rows)
+    more = lazy and remaining > 0
+    html = render_template(
+        "_rows.html",
+        decisions=rows,
+        remaining=remaining,
+        more_url=url_for("rows_fragment", **filter_args(filters, page=page + 1)) if more else None,
+        page_url=url_for("index", **filter_args(filters, page=page + 1)) if more else None,
+    )
+    fragment = {"html": Markup(html), "total": len(decisions), "count": len(rows)}
+    if cacheable:
+        fragment_cache.put(key, fragment)
+    return fragment
 
-    blocks = {}
-    for d in filtered:
-        b = d["block"]
-        if b not in blocks:
-            blocks[b] = []
-        blocks[b].append(d)
+
+@app.route("/")
+def index():
+    snapshot = current_snapshot()
+    index = snapshot.index
+    stats = dashboard_stats(index)
+    filters = dashboard_filters()
+    page = page_number()
+
+    pager = None
+    if filters["block"] == "all" and not filters["q"] and not filters["upcoming"]:
+        # One section per block, each showing its first page; more rows load lazily.
+        blocks = [b for b in BLOCK_MAP if index.count(block=b)]
+        blocks += [b for b in index.by_block if b not in BLOCK_MAP and index.count(block=b)]
+        sections = []
+        for block in blocks:
+            fragment = rows_page(snapshot, dict(filters, block=block), 1, lazy=True)
+            if fragment["total"]:
+                sections.append(dict(fragment, title=BLOCK_MAP.get(block, block)))
+    else:
+        fragment = rows_page(snapshot, filters, page)
+        sections = [dict(fragment, title=None)] if fragment["count"] else []
+        pages = max(1, -(-fragment["total"] // DASHBOARD_PAGE_SIZE))
+        pager = {
+            "page": page,
+            "pages": pages,
+            "prev_url": url_for("index", **filter_args(filters, page=page - 1)) if page > 1 else None,
+            "next_url": url_for("index", **filter_args(filters, page=page + 1)) if page < pages else None,
+        }
 
     return render_template(
         "index.html",
-        blocks=blocks,
+        sections=sections,
+        pager=pager,
+        shown=sum(section["count"] for section in sections),
         block_map=BLOCK_MAP,
         status_map=STATUS_MAP,
         stats=stats,
-        filter_block=filter_block,
-        filter_status=filter_status,
+        filter_block=filters["block"],
+        filter_status=filters["status"],
+        query=filters["q"],
+        upcoming=filters["upcoming"],
+        upcoming_days=UPCOMING_DAYS,
     )
 
 
+@app.route("/partials/rows")
+def rows_fragment():
+    return rows_page(current_snapshot(), dashboard_filters(), page_number(), lazy=True)["html"]
+
+
 @app.route("/add", methods=["GET", "POST"])
 def add():
     if request.method == "POST":
-        data = load_data()
-        new_id = request.form.get("id", "").strip()
-        if not new_id:
-            block_prefix = {"structure": "S", "sales": "P", "coo": "C", "finance": "F", "ops": "O", "open": "Q"}
-            b = request.form.get("block", "ops")
-            existing = [d for d in data["decisions"] if d["block"] == b]
-            new_id = f"{block_prefix.get(b, 'X')}-{len(existing)+1:02d}"
-
         new_decision = {
-            "id": new_id,
+            "id": request.form.get("id", "").strip(),
             "block": request.form.get("block", "ops"),
             "decision": request.form.get("decision", ""),
             "responsible": request.form.get("responsible", ""),
@@ -323,13 +765,23 @@ def add():
             "date_created": datetime.now().strftime("%Y-%m-%d"),
             "source": request.form.get("source", ""),
         }
-        data["decisions"].append(new_decision)
-        data["history"].append({
-            "action": "add",
-            "id": new_id,
-            "timestamp": datetime.now().isoformat(),
-        })
-        save_data(data)
+
+        def apply(tx):
+            dec = dict(new_decision)
+            if not dec["id"]:
+                dec["id"] = next_decision_id(tx, dec["block"])
+            tx.insert(dec)
+            tx.append_history({
+                "action": "add",
+                "id": dec["id"],
+                "timestamp": datetime.now().isoformat(),
+            })
+
+        try:
+            run_tx(apply)
+        except storage.DuplicateIdError as e:
+            flash(f"Решение {e} уже существует", "error")
+            return redirect(url_for("add"))
         return redirect(url_for("index"))
 
     return render_template(
@@ -341,25 +793,27 @@ def add():
 
 @app.route("/update/<decision_id>", methods=["POST"])
 def update(decision_id):
-    data = load_data()
-    for d in data["decisions"]:
-        if d["id"] == decision_id:
-            old_status = d["status"]
-            new_status = request.form.get("status", d["status"])
-            d["status"] = new_status
-            d["comment"] = request.form.get("comment", d["comment"])
-            d["deadline"] = request.form.get("deadline", d["deadline"])
-            d["responsible"] = request.form.get("responsible", d["responsible"])
-            if old_status != new_status:
-                data["history"].append({
-                    "action": "status_change",
-                    "id": decision_id,
-                    "from": old_status,
-                    "to": new_status,
-                    "timestamp": datetime.now().isoformat(),
-                })
-            break
-    save_data(data)
+    changes = {
+        field: request.form[field]
+        for field in ("status", "comment", "deadline", "responsible")
+        if field in request.form
+    }
+
+    def apply(tx):
+        result = tx.update(decision_id, changes)
+        if not result:
+            return
+        old, new = result
+        if old["status"] != new["status"]:
+            tx.append_history({
+                "action": "status_change",
+                "id": decision_id,
+                "from": old["status"],
+                "to": new["status"],
+                "timestamp": datetime.now().isoformat(),
+            })
+
+    run_tx(apply)
     return redirect(url_for("index"))
 
 
@@ -368,72 +822,384 @@ def sync():
     try:
         hub_ok = False
         hub_stats = {}
-        hub_error = None
+        status = None
 
         if CONTEXT_HUB_KEY:
-            health = hub_get("/api/health")
-            hub_ok = bool(health and isinstance(health, dict) and health.get("status") == "ok")
-            if hub_ok:
-                stats_result = hub_get("/api/decisions/stats")
-                if isinstance(stats_result, dict):
-                    hub_stats = stats_result
-        else:
-            hub_error = "no_key"
+            status = hub_status.get()
+            hub_ok = status["value"] is not None and not status["error"]
+            if status["value"]:
+                hub_stats = status["value"]["stats"]
 
         if request.method == "POST":
             action = request.form.get("action")
-            if action == "pull":
-                count, msg = sync_pull()
-                flash(msg, "success" if count > 0 else "info")
-            elif action == "push":
-                count, msg = sync_push()
-                flash(msg, "success" if count > 0 else "info")
-            elif action == "full":
-                pull_count, pull_msg = sync_pull()
-                push_count, push_msg = sync_push()
-                flash(f"{pull_msg}. {push_msg}", "success")
+            if action in SYNC_ACTIONS:
+                job, created = enqueue_sync(action)
+                if created:
+                    flash(f"Синхронизация поставлена в очередь (задача {job['id']})", "success")
+                else:
+                    flash(f"Синхронизация уже выполняется (задача {job['id']})", "info")
             return redirect(url_for("sync"))
 
-        data = load_data()
-        local_count = len(data["decisions"])
-        local_with_hub = sum(1 for d in data["decisions"] if d.get("hub_id"))
+        index = current_snapshot().index
+        local_count = index.count()
+        local_with_hub = index.linked_count()
         local_only = local_count - local_with_hub
-        last_sync = None
-        for h in reversed(data.get("history", [])):
-            if h.get("action", "").startswith("sync_"):
-                last_sync = h
-                break
+        last_sync = store.history.last("sync_")
 
         return render_template("sync.html",
             hub_ok=hub_ok,
             hub_url=CONTEXT_HUB_URL,
             hub_stats=hub_stats,
+            hub_status=status,
             local_count=local_count,
             local_with_hub=local_with_hub,
             local_only=local_only,
             last_sync=last_sync,
             has_key=bool(CONTEXT_HUB_KEY),
+            sync_jobs=job_queue.recent(5),
+            job_labels=SYNC_JOB_LABELS,
         )
     except Exception as e:
         return f"<h2>Sync Error</h2><pre>{e}</pre><p><a href='/'>← Dashboard</a></p>", 500
 
 
+API_FILTERS = ("block", "status", "responsible", "deadline_from", "deadline_to", "updated_since")
+
+
 @app.route("/api/decisions")
 def api_decisions():
-    data = load_data()
-    return jsonify(data)
+    """Decisions as JSON or NDJSON, filtered, paginated and cacheable.
+
+    Query parameters: q (full-text), block, status, responsible (substring),
+    deadline_from, deadline_to, updated_since, limit + cursor, fields
+    (comma-separated), format=ndjson, history=1.
+    """
+    snapshot = current_snapshot()
+    index = snapshot.index
+    # The cache stamp changes with every write, so it versions every query;
+    # the format is part of the tag because Accept can change it for one URL.
+    fmt = "ndjson" if wants_ndjson() else "json"
+    etag = hashlib.md5(
+        f"{data_cache.stats()['stamp']}|{fmt}|{request.query_string.decode()}".encode()
+    ).hexdigest()
+    last_modified = None
+    if index.last_modified:
+        try:
+            # updated_at is server local time; HTTP dates are UTC.
+            last_modified = datetime.fromisoformat(index.last_modified[:19]).astimezone(timezone.utc)
+        except ValueError:
+            pass
+    if request.if_none_match.contains(etag) or (
+        not request.if_none_match and last_modified and request.if_modified_since
+        and last_modified <= request.if_modified_since
+    ):
+        response = Response(status=304)
+    else:
+        response = decisions_response(snapshot)
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.vary.add("Accept")
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def bad_request(message):
+    response = jsonify({"error": message})
+    response.status_code = 400
+    return response
+
+
+def wants_ndjson():
+    return request.args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson"
+
+
+def decisions_response(snapshot):
+    index = snapshot.index
+    args = request.args
+    filters = {name: args.get(name) or None for name in API_FILTERS}
+    for name in ("block", "status"):
+        if filters[name] == "all":
+            filters[name] = None
+    try:
+        limit = int(args["limit"]) if args.get("limit") else None
+        after = int(args["cursor"]) if args.get("cursor") else None
+    except ValueError:
+        return bad_request("limit and cursor must be integers")
+    if limit is not None and limit < 1:
+        return bad_request("limit must be at least 1")
+
+    query = args.get("q", "").strip()
+    decisions = index.query(after=after, ids=snapshot.search(query) if query else None, **filters)
+    next_cursor = None
+    if limit is not None and len(decisions) > limit:
+        decisions = decisions[:limit]
+        next_cursor = str(index.position(decisions[-1]["id"]))
+
+    fields = [f for f in args.get("fields", "").split(",") if f]
+    if fields:
+        decisions = [{f: d.get(f) for f in fields} for d in decisions]
+
+    if wants_ndjson():
+        def stream():
+            for d in decisions:
+                yield json.dumps(d, ensure_ascii=False, default=str) + "\n"
+        response = Response(stream(), mimetype="application/x-ndjson")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+
+    body = {"decisions": decisions}
+    if limit is not None:
+        body["next_cursor"] = next_cursor
+    if args.get("history"):
+        # Only the latest entries; the full log is per decision below.
+        body["history"] = list(reversed(store.history.recent(HISTORY_API_LIMIT)))
+    return jsonify(body)
+
+
+BATCH_CREATE_FIELDS = ("id", "block", "decision", "responsible", "deadline", "check_date", "status",
+                       "comment", "source", "tags")
+BATCH_UPDATE_FIELDS = ("decision", "responsible", "deadline", "check_date", "status", "comment", "tags")
+
+
+class BatchConflict(Exception):
+    """A batch item could not be applied; nothing from the batch was written."""
+
+    def __init__(self, results):
+        super().__init__("batch conflict")
+        # The transaction was rolled back, so ids allocated for other items were never written.
+        self.results = [
+            r if r["result"] == "error" else {"index": r["index"], "result": "not_applied"} for r in results
+        ]
+
+
+def validate_batch_item(item, creating):
+    if not isinstance(item, dict):
+        return ["item must be an object"]
+    errors = []
+    allowed = BATCH_CREATE_FIELDS if creating else BATCH_UPDATE_FIELDS + ("id",)
+    unknown = sorted(set(item) - set(allowed))
+    if unknown:
+        errors.append(f"unknown fields: {', '.join(unknown)}")
+    if creating and not str(item.get("decision") or "").strip():
+        errors.append("decision is required")
+    if not creating and not item.get("id"):
+        errors.append("id is required")
+    if "block" in item and item["block"] not in BLOCK_MAP:
+        errors.append(f"unknown block: {item['block']}")
+    if "status" in item and item["status"] not in STATUS_MAP:
+        errors.append(f"unknown status: {item['status']}")
+    for field in ("deadline", "check_date"):
+        if item.get(field) and not DATE_RE.match(str(item[field])):
+            errors.append(f"{field} must be YYYY-MM-DD")
+    return errors
+
+
+def create_batch(items, skip_existing=False):
+    """Insert ``items`` in one transaction with one ``batch_create`` history entry.
+
+    Ids are allocated per block for items without one. With ``skip_existing``
+    items whose title is already tracked are skipped instead of duplicated.
+    Raises ``BatchConflict`` (and writes nothing) if an explicit id is taken.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+
+    def apply(tx):
+        results, created = [], []
+        for n, item in enumerate(items):
+            dec = {
+                "id": "", "block": "ops", "decision": "", "responsible": "", "deadline": "",
+                "check_date": "", "status": "active", "comment": "", "date_created": today, "source": "",
+            }
+            dec.update(item)
+            dec["id"] = str(dec["id"] or "").strip()
+            if skip_existing and tx.has_title(dec["decision"]):
+                results.append({"index": n, "result": "skipped", "reason": "title exists"})
+                continue
+            if dec["id"] and tx.get(dec["id"]) is not None:
+                results.append({"index": n, "result": "error", "error": f"id {dec['id']} already exists"})
+                continue
+            if not dec["id"]:
+                dec["id"] = next_decision_id(tx, dec["block"])
+            tx.insert(dec)
+            created.append(dec["id"])
+            results.append({"index": n, "result": "created", "id": dec["id"]})
+        if any(r["result"] == "error" for r in results):
+            raise BatchConflict(results)
+        if created:
+            tx.append_history({
+                "action": "batch_create",
+                "ids": created,
+                "count": len(created),
+                "timestamp": datetime.now().isoformat(),
+            })
+        return results
+
+    return run_tx(apply)
+
+
+def update_batch(items):
+    """Apply ``items`` (each with an ``id``) in one transaction.
+
+    Status changes are listed inside the single ``batch_update`` history
+    entry. Raises ``BatchConflict`` (and writes nothing) if an id is unknown.
+    """
+
+    def apply(tx):
+        results, updated, status_changes = [], [], []
+        for n, item in enumerate(items):
+            changes = {field: item[field] for field in BATCH_UPDATE_FIELDS if field in item}
+            result = tx.update(item["id"], changes)
+            if not result:
+                results.append({"index": n, "result": "error", "error": f"id {item['id']} not found"})
+                continue
+            old, new = result
+            if old.get("status") != new.get("status"):
+                status_changes.append({"id": item["id"], "from": old.get("status"), "to": new.get("status")})
+            updated.append(item["id"])
+            results.append({"index": n, "result": "updated", "id": item["id"]})
+        if any(r["result"] == "error" for r in results):
+            raise BatchConflict(results)
+        if updated:
+            tx.append_history({
+                "action": "batch_update",
+                "ids": updated,
+                "count": len(updated),
+                "status_changes": status_changes,
+                "timestamp": datetime.now().isoformat(),
+            })
+        return results
+
+    return run_tx(apply)
+
+
+@app.route("/api/decisions/batch", methods=["POST", "PATCH"])
+def api_decisions_batch():
+    """Create (POST) or update (PATCH) many decisions in one write.
+
+    Body: ``{"decisions": [...]}`` or a bare list. POST also accepts
+    ``"skip_existing": true``. Responds with one result per item; on a
+    validation error (400) or conflict (409) nothing is written.
+    """
+    payload = request.get_json(silent=True)
+    items = payload.get("decisions") if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "expected a non-empty list of decisions"}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"at most {BATCH_MAX_ITEMS} decisions per batch"}), 400
+
+    creating = request.method == "POST"
+    invalid = [
+        {"index": n, "result": "error", "error": "; ".join(errors)}
+        for n, errors in enumerate(validate_batch_item(item, creating) for item in items)
+        if errors
+    ]
+    if invalid:
+        return jsonify({"results": invalid}), 400
+    try:
+        if creating:
+            skip_existing = isinstance(payload, dict) and bool(payload.get("skip_existing"))
+            results = create_batch(items, skip_existing)
+        else:
+            results = update_batch(items)
+    except BatchConflict as e:
+        return jsonify({"results": e.results}), 409
+    return jsonify({"results": results}), 201 if creating else 200
+
+
+@app.cli.command("import-tracker")
+@click.argument("path", default=os.path.join("my brain", "_core", "decision_tracker.md"))
+def import_tracker_command(path):
+    """Bulk-load the decision tables of a decision_tracker.md file."""
+    with open(path, encoding="utf-8") as f:
+        items = parse_decision_tracker(f.read())
+    results = create_batch(items, skip_existing=True)
+    created = sum(1 for r in results if r["result"] == "created")
+    print(f"Импортировано {created} из {len(items)} решений ({len(items) - created} уже были)")
+
+
+@app.cli.command("convert-data")
+@click.option("--format", "fmt", type=click.Choice(serialization.FORMATS), default=DATA_FORMAT)
+@click.option("--compression", type=click.Choice(serialization.COMPRESSIONS), default=DATA_COMPRESSION)
+def convert_data_command(fmt, compression):
+    """Rewrite the JSON data file in another format; loading detects it automatically."""
+    if store.backend != "json":
+        raise click.ClickException("convert-data works with the JSON backend only")
+    try:
+        codec = serialization.Codec(fmt, compression)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    with open(store.path, "rb") as f:
+        old_format = serialization.detect(f.read())
+    before, after = store.convert(codec)
+    print(f"{store.path}: {serialization.describe(*old_format)}, {before} байт -> "
+          f"{serialization.describe(codec.format, codec.compression)}, {after} байт")
+    if (fmt, compression) != (DATA_FORMAT, DATA_COMPRESSION):
+        print("Задайте DATA_FORMAT/DATA_COMPRESSION так же, иначе следующее сохранение вернёт прежний формат")
+
+
+@app.cli.command("export-data")
+@click.argument("path", default="-")
+@click.option("--with-history", is_flag=True, help="Include the full decision history.")
+def export_data_command(path, with_history):
+    """Write the data as indented JSON for reading or diffing ("-" for stdout)."""
+    data = store.load()
+    if with_history:
+        data["history"] = store.history.all()
+    text = serialization.Codec("pretty").encode(data).decode("utf-8")
+    if path == "-":
+        click.echo(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Экспортировано {len(data.get('decisions', []))} решений в {path}")
+
+
+@app.route("/api/decisions/upcoming")
+def api_upcoming():
+    try:
+        days = int(request.args.get("days", UPCOMING_DAYS))
+    except ValueError:
+        return jsonify({"error": "days must be an integer"}), 400
+    return jsonify({"days": days, "upcoming": [
+        {"date": day, "field": field, "decision": dec}
+        for day, field, dec in upcoming_decisions(current_snapshot(), days)
+    ]})
+
+
+@app.route("/api/decisions/<decision_id>/history")
+def api_decision_history(decision_id):
+    return jsonify({"id": decision_id, "history": store.history.for_decision(decision_id)})
+
+
+@app.route("/api/cache/stats")
+def api_cache_stats():
+    return jsonify(dict(data_cache.stats(), fragments=fragment_cache.stats()))
 
 
 @app.route("/api/sync/pull", methods=["POST"])
 def api_sync_pull():
-    count, msg = sync_pull()
-    return jsonify({"count": count, "message": msg})
+    return job_response(*enqueue_sync("pull"))
 
 
 @app.route("/api/sync/push", methods=["POST"])
 def api_sync_push():
-    count, msg = sync_push()
-    return jsonify({"count": count, "message": msg})
+    return job_response(*enqueue_sync("push"))
+
+
+@app.route("/api/sync/full", methods=["POST"])
+def api_sync_full():
+    return job_response(*enqueue_sync("full"))
+
+
+@app.route("/api/sync/jobs/<job_id>")
+def api_sync_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "not found"}), 404
+    return job_response(job)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""Benchmark sync_push() against the local fake Context Hub.
+
+Compares a serial push (one worker) with the pooled pipeline and checks
+that every decision ends up with a hub_id exactly once.
+
+    python bench/bench_push.py --decisions 200 --latency 0.02 --workers 1 8 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakehub import FakeHub  # noqa: E402
+
+
+def local_decisions(count):
+    blocks = ["structure", "sales", "coo", "finance", "ops", "open"]
+    return [
+        {"id": f"B-{i:05d}", "block": blocks[i % len(blocks)], "decision": f"Локальное решение {i}",
+         "responsible": "Камилла", "deadline": "2026-03-31", "check_date": "", "status": "active",
+         "comment": "", "date_created": "2026-02-25", "source": "bench"}
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--decisions", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    with FakeHub(latency=args.latency, failure_rate=args.failure_rate) as fake:
+        os.environ.update({
+            "CONTEXT_HUB_URL": fake.url,
+            "CONTEXT_HUB_KEY": "bench",
+            "DATA_FILE": os.environ.get("DATA_FILE") or os.path.join(tmp, "decisions.json"),
+        })
+        import app
+
+        for workers in args.workers:
+            app.save_data({"decisions": local_decisions(args.decisions), "history": []})
+            app.HUB_PUSH_WORKERS = workers
+            started = time.perf_counter()
+            pushed, _ = app.sync_push()
+            elapsed = time.perf_counter() - started
+            linked = sum(1 for d in app.load_data()["decisions"] if d.get("hub_id"))
+            print(f"workers={workers:3d} pushed={pushed}/{args.decisions} linked={linked} "
+                  f"time={elapsed:.2f}s ({pushed / elapsed:.1f} decisions/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare data file formats: encode/decode time, file size, store load/save.
+
+Uses the same synthetic decisions as bench_suite.py and measures every
+format/compression combination available in this environment against the
+file as it used to be handled (stdlib ``json.dump(indent=2)``/``json.load``),
+first on the codec alone and then through ``JsonStore.save``/``load`` with
+fsync and the atomic rename.
+
+    python bench/bench_serialization.py --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import serialization  # noqa: E402
+import storage  # noqa: E402
+from bench_suite import synthetic_data  # noqa: E402
+
+
+def available_codecs():
+    codecs = []
+    for fmt in serialization.FORMATS:
+        for compression in serialization.COMPRESSIONS:
+            try:
+                codecs.append(serialization.Codec(fmt, compression))
+            except ValueError:
+                continue
+    return codecs
+
+
+def label(codec):
+    return serialization.describe(codec.format, codec.compression)
+
+
+def best_of(fn, iterations):
+    times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def run_size(size, iterations):
+    data = synthetic_data(size)
+    data.pop("history")
+    legacy = json.dumps(data, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+    rows = [{
+        "codec": "legacy",
+        "bytes": len(legacy),
+        "dumps_ms": best_of(lambda: json.dumps(data, ensure_ascii=False, indent=2, default=str).encode("utf-8"),
+                            iterations),
+        "loads_ms": best_of(lambda: json.loads(legacy), iterations),
+        "save_ms": None,
+        "load_ms": None,
+    }]
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in available_codecs():
+            raw = codec.dumps(data)
+            assert serialization.loads(raw)["decisions"] == data["decisions"]
+            path = os.path.join(tmp, f"{label(codec)}.json")
+            store = storage.JsonStore(path, codec=codec)
+            store.save(dict(data))
+            rows.append({
+                "codec": label(codec),
+                "bytes": len(raw),
+                "dumps_ms": best_of(lambda: codec.dumps(data), iterations),
+                "loads_ms": best_of(lambda: serialization.loads(raw), iterations),
+                "save_ms": best_of(lambda: store.save(dict(data)), iterations),
+                "load_ms": best_of(store.load, iterations),
+            })
+    return rows
+
+
+def print_table(size, rows):
+    base = rows[0]
+    print(f"\n== {size} decisions (speedup vs legacy stdlib JSON) ==")
+    print(f"{'codec':<14} {'KB':>8} {'dumps ms':>9} {'loads ms':>9} {'dumps x':>8} {'loads x':>8} "
+          f"{'save ms':>9} {'load ms':>9}")
+    for r in rows:
+        store_ms = " ".join(f"{v:>9.2f}" if v is not None else f"{'-':>9}" for v in (r["save_ms"], r["load_ms"]))
+        print(f"{r['codec']:<14} {r['bytes'] // 1024:>8} {r['dumps_ms']:>9.2f} {r['loads_ms']:>9.2f} "
+              f"{base['dumps_ms'] / r['dumps_ms']:>8.2f} {base['loads_ms'] / r['loads_ms']:>8.2f} {store_ms}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    print(f"orjson: {'yes' if serialization.orjson else 'no'}, "
+          f"msgpack: {'yes' if serialization.msgpack else 'no'}, "
+          f"zstandard: {'yes' if serialization.zstandard else 'no'}")
+    for size in args.sizes:
+        print_table(size, run_size(size, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Benchmark the tracker's hot paths on synthetic data.
+
+Generates decision sets of the given sizes with a realistic amount of
+history, then drives the dashboard, add/update, the JSON API and both sync
+directions through Flask's test client against a local fake Context Hub.
+For every operation it reports p50/p99 latency, throughput, peak Python
+memory (tracemalloc, measured in a separate pass) and bytes passed to
+write() per call.
+
+    python bench/bench_suite.py --sizes 1000 10000 --output bench-results.json
+    python bench/bench_suite.py --sizes 1000 10000 --baseline bench-results.json
+
+Each size runs in a fresh process with its own data directory, so results
+do not leak memory or caches between sizes. With ``--baseline`` the run is
+compared against an earlier output file and exits with status 1 if any
+p50 got slower than ``--tolerance`` allows.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakehub import FakeHub  # noqa: E402
+
+BLOCKS = {"structure": "S", "sales": "P", "coo": "C", "finance": "F", "ops": "O", "open": "Q"}
+STATUSES = ["active"] * 5 + ["done"] * 3 + ["overdue", "no_deadline", "deferred"]
+PEOPLE = ["Камилла", "Рэшад", "Женя, Саша", "Костя + Вика", "Наташа + Настя", "Паша", "РГ"]
+
+
+def synthetic_data(count, seed=0):
+    """``count`` decisions spread over all blocks, with 0-4 status changes each."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    per_block = {block: 0 for block in BLOCKS}
+    decisions, history = [], []
+    for i in range(count):
+        block = rng.choice(list(BLOCKS))
+        per_block[block] += 1
+        created = start + timedelta(minutes=37 * i)
+        deadline = (created + timedelta(days=rng.randint(3, 90))).strftime("%Y-%m-%d")
+        dec = {
+            "id": f"{BLOCKS[block]}-{per_block[block]:02d}",
+            "block": block,
+            "decision": f"Решение №{i}: {rng.choice(['запуск', 'проверка', 'регламент', 'найм', 'бюджет'])}",
+            "responsible": rng.choice(PEOPLE),
+            "deadline": deadline if rng.random() < 0.7 else "",
+            "check_date": deadline if rng.random() < 0.5 else "",
+            "status": rng.choice(STATUSES),
+            "comment": "Синтетический комментарий " * rng.randint(0, 3),
+            "date_created": created.strftime("%Y-%m-%d"),
+            "source": f"Встреча {created:%d.%m}",
+            "updated_at": created.isoformat(timespec="seconds"),
+            # Already synced, so sync_push only sees what the benchmark adds.
+            "hub_id": f"hub-local-{i}",
+        }
+        decisions.append(dec)
+        history.append({"action": "add", "id": dec["id"], "timestamp": created.isoformat()})
+        status = "active"
+        for step in range(rng.randint(0, 4)):
+            new_status = rng.choice(STATUSES)
+            history.append({
+                "action": "status_change", "id": dec["id"], "from": status, "to": new_status,
+                "timestamp": (created + timedelta(days=step + 1)).isoformat(),
+            })
+            status = new_status
+    history.sort(key=lambda e: e["timestamp"])
+    return {"decisions": decisions, "history": history}
+
+
+def bytes_written():
+    """Bytes this process has passed to write() so far (Linux only)."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(op, iterations, setup=None, memory_iterations=3):
+    """Time ``op(i)``; ``setup(i)`` runs before each call and is not timed."""
+    timings = []
+    written = 0
+    for i in range(iterations):
+        if setup:
+            setup(i)
+        before = bytes_written()
+        started = time.perf_counter()
+        op(i)
+        timings.append(time.perf_counter() - started)
+        after = bytes_written()
+        if before is not None:
+            written += after - before
+
+    # tracemalloc slows everything down, so peak memory gets its own pass.
+    peak = 0
+    for i in range(iterations, iterations + memory_iterations):
+        if setup:
+            setup(i)
+        tracemalloc.start()
+        op(i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    total = sum(timings)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50) * 1000, 3),
+        "p99_ms": round(percentile(timings, 99) * 1000, 3),
+        "mean_ms": round(total / iterations * 1000, 3),
+        "ops_per_sec": round(iterations / total, 1) if total else None,
+        "peak_mem_kb": round(peak / 1024, 1) if memory_iterations else None,
+        "bytes_written": written // iterations if bytes_written() is not None else None,
+    }
+
+
+def run_size(size, iterations, backend):
+    """Benchmark one data size in this process; returns ``{op: stats}``."""
+    tmp = tempfile.mkdtemp(prefix=f"bench-{size}-")
+    suffix = ".db" if backend == "sqlite" else ".json"
+    fake = FakeHub(seed=max(10, size // 10)).start()
+    os.environ.update({
+        "DATA_FILE": os.path.join(tmp, "decisions" + suffix),
+        "CONTEXT_HUB_URL": fake.url,
+        "CONTEXT_HUB_KEY": "bench",
+        "SYNC_INTERVAL": "0",
+    })
+    import app
+
+    app.save_data(synthetic_data(size))
+    client = app.app.test_client()
+    ids = [d["id"] for d in app.load_data()["decisions"]]
+    rng = random.Random(1)
+    results = {}
+
+    def get(url, expect=200, headers=None):
+        r = client.get(url, headers=headers)
+        assert r.status_code == expect, (url, r.status_code)
+        return r
+
+    results["index"] = measure(lambda i: get("/"), iterations)
+    results["index_filtered"] = measure(lambda i: get("/?block=sales&status=active"), iterations)
+    results["api_decisions_page"] = measure(lambda i: get("/api/decisions?limit=100"), iterations)
+    results["api_decisions_full"] = measure(lambda i: get("/api/decisions"), iterations)
+    etag = get("/api/decisions?limit=100").headers["ETag"]
+    results["api_decisions_304"] = measure(
+        lambda i: get("/api/decisions?limit=100", 304, {"If-None-Match": etag}), iterations
+    )
+    results["add"] = measure(
+        lambda i: client.post("/add", data={"decision": f"Новое решение {i}", "block": "ops",
+                                            "responsible": "Бенчмарк", "deadline": "2026-12-31"}),
+        iterations,
+    )
+    statuses = ["active", "done", "overdue"]
+    results["update"] = measure(
+        lambda i: client.post(f"/update/{rng.choice(ids)}", data={"status": statuses[i % 3]}), iterations
+    )
+
+    # The first pull imports everything the hub has; later ones are incremental.
+    results["sync_pull_initial"] = measure(lambda i: app.sync_pull(), 1, memory_iterations=0)
+    hub_ids = [d["id"] for d in fake.state.decisions]
+
+    def touch_hub(i):
+        for hub_id in random.Random(i).sample(hub_ids, min(10, len(hub_ids))):
+            fake.state.update_decision(hub_id, responsible=f"Обновлено {i}")
+
+    results["sync_pull_incremental"] = measure(lambda i: app.sync_pull(), iterations, setup=touch_hub)
+
+    def add_pending(i):
+        app.run_tx(lambda tx: [
+            tx.insert({"id": f"B-{i}-{n}", "block": "ops", "decision": f"К отправке {i}/{n}",
+                       "status": "active", "source": "bench"})
+            for n in range(20)
+        ])
+
+    results["sync_push_20"] = measure(lambda i: app.sync_push(), iterations, setup=add_pending)
+    fake.stop()
+    results["_process"] = {"max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Print p50 ratios against ``baseline``; return the regressions found."""
+    regressions = []
+    for size, ops in current["results"].items():
+        base_ops = baseline.get("results", {}).get(size, {})
+        for op, stats in ops.items():
+            base = base_ops.get(op)
+            if op.startswith("_") or not base or not base.get("p50_ms"):
+                continue
+            ratio = stats["p50_ms"] / base["p50_ms"]
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions.append((size, op, ratio))
+            print(f"{size:>8} {op:<24} p50 {base['p50_ms']:>9.2f} -> {stats['p50_ms']:>9.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def print_table(results):
+    for size, ops in results.items():
+        print(f"\n== {size} decisions ==")
+        print(f"{'operation':<24} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'peak KB':>10} {'bytes/op':>11}")
+        for op, s in ops.items():
+            if op.startswith("_"):
+                print(f"{'max RSS KB':<24} {s['max_rss_kb']:>9}")
+                continue
+            peak = s["peak_mem_kb"] if s["peak_mem_kb"] is not None else "-"
+            written = s["bytes_written"] if s["bytes_written"] is not None else "-"
+            print(f"{op:<24} {s['p50_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['ops_per_sec'] or 0:>9.1f} "
+                  f"{peak:>10} {written:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against an earlier --output file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    parser.add_argument("--single-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_size:
+        json.dump(run_size(args.single_size, args.iterations, args.backend), sys.stdout)
+        return
+
+    results = {}
+    for size in args.sizes:
+        print(f"Running {size} decisions...", file=sys.stderr)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--single-size", str(size),
+             "--iterations", str(args.iterations), "--backend", args.backend],
+            check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        # app.py prints its own log lines; the results are the last line.
+        results[str(size)] = json.loads(out.strip().splitlines()[-1])
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "backend": args.backend,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSaved to {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline.get('meta', {}).get('timestamp', '?')}):")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} operation(s) slower than baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
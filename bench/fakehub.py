@@ -0,0 +1,235 @@
+"""Local fake Context Hub for tests and benchmarks.
+
+Implements the endpoints the tracker calls (health, stats, list, extract,
+draft, confirm) in memory, with configurable per-request latency and a
+random 503 failure rate to exercise retries.
+
+    python bench/fakehub.py --port 8765 --latency 0.05 --seed 500
+
+or from Python::
+
+    with FakeHub(latency=0.02) as fake:
+        os.environ["CONTEXT_HUB_URL"] = fake.url
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DOMAINS = ["hr", "operations", "sales", "management", "finance", "logistics", "marketing", "general"]
+
+
+class HubState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.decisions = []
+        self.drafts = {}
+        self.ids = itertools.count(1)
+        self.calls = {}
+
+    def new_id(self, prefix):
+        return f"{prefix}{next(self.ids):06d}"
+
+    def add_decision(self, title, **fields):
+        now = datetime.now().isoformat()
+        dec = {
+            "id": self.new_id("hub-"),
+            "title": title,
+            "content": fields.get("content", ""),
+            "domain": fields.get("domain", "general"),
+            "status": fields.get("status", "active"),
+            "deadline": fields.get("deadline"),
+            "responsible": fields.get("responsible"),
+            "tags": fields.get("tags", []),
+            "createdAt": fields.get("createdAt", now),
+            "updatedAt": fields.get("updatedAt", now),
+        }
+        self.decisions.append(dec)
+        return dec
+
+    def update_decision(self, hub_id, **fields):
+        for dec in self.decisions:
+            if dec["id"] == hub_id:
+                dec.update(fields)
+                dec["updatedAt"] = datetime.now().isoformat()
+                return dec
+        return None
+
+    def list_decisions(self, params):
+        """Filter by ``updatedSince`` and page by ``cursor``/``offset``."""
+        items = self.decisions
+        since = params.get("updatedSince")
+        if since:
+            items = [d for d in items if d["updatedAt"] >= since]
+        items = sorted(items, key=lambda d: d["updatedAt"])
+        limit = int(params.get("limit", 50))
+        start = int(params.get("cursor") or params.get("offset") or 0)
+        page = items[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(items) else None
+        return {"decisions": page, "nextCursor": next_cursor}
+
+    def seed(self, count, rng=None):
+        rng = rng or random.Random(0)
+        start = datetime(2026, 1, 1)
+        for i in range(count):
+            created = start + timedelta(minutes=i)
+            self.add_decision(
+                f"Решение из хаба №{i}",
+                content=f"Синтетическое решение {i}",
+                domain=rng.choice(DOMAINS),
+                deadline=(created + timedelta(days=rng.randint(1, 60))).strftime("%Y-%m-%d"),
+                responsible=rng.choice(["Камилла", "Рэшад", "Женя", "Саша", "Костя"]),
+                createdAt=created.isoformat(),
+                updatedAt=created.isoformat(),
+            )
+
+
+class FakeHubHandler(BaseHTTPRequestHandler):
+    server_version = "FakeContextHub/1.0"
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, fmt, *args):
+        pass
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _reply(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _before(self, path):
+        with self.state.lock:
+            self.state.calls[path] = self.state.calls.get(path, 0) + 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.failure_rate and random.random() < self.server.failure_rate:
+            self._reply({"error": "unavailable"}, 503)
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not self._before(url.path):
+            return
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/api/health":
+            return self._reply({"status": "ok"})
+        if url.path == "/api/decisions/stats":
+            with self.state.lock:
+                by_status = {}
+                for d in self.state.decisions:
+                    by_status[d["status"]] = by_status.get(d["status"], 0) + 1
+                return self._reply({"total": len(self.state.decisions), "byStatus": by_status,
+                                    "overdue": 0, "verified": 0})
+        if url.path == "/api/decisions":
+            with self.state.lock:
+                return self._reply(self.state.list_decisions(params))
+        self._reply({"error": "not found"}, 404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        payload = self._body()
+        if not self._before(url.path):
+            return
+        if url.path == "/api/decisions/extract":
+            text = payload.get("text", "")
+            return self._reply({
+                "extracted": {"title": text.split(". ")[0], "content": text},
+                "missingFields": [],
+            })
+        if url.path == "/api/decisions/draft":
+            with self.state.lock:
+                draft_id = self.state.new_id("draft-")
+                self.state.drafts[draft_id] = payload
+            return self._reply({"draftId": draft_id})
+        m = re.fullmatch(r"/api/decisions/draft/([^/]+)/confirm", url.path)
+        if m:
+            with self.state.lock:
+                draft = self.state.drafts.pop(m.group(1), None)
+                if draft is None:
+                    return self._reply({"error": "draft not found"}, 404)
+                extracted = draft.get("extracted", {})
+                dec = self.state.add_decision(
+                    extracted.get("title") or draft.get("rawText", ""),
+                    content=extracted.get("content", ""),
+                    domain=extracted.get("domain", "general"),
+                    deadline=extracted.get("deadline"),
+                    responsible=extracted.get("responsible"),
+                )
+            return self._reply({"id": dec["id"]})
+        self._reply({"error": "not found"}, 404)
+
+
+class FakeHub:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, failure_rate=0.0, seed=0):
+        self.server = ThreadingHTTPServer((host, port), FakeHubHandler)
+        self.server.daemon_threads = True
+        self.server.state = HubState()
+        self.server.latency = latency
+        self.server.failure_rate = failure_rate
+        if seed:
+            self.server.state.seed(seed)
+        self._thread = None
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Context Hub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="number of hub decisions to pre-populate")
+    args = parser.parse_args()
+
+    fake = FakeHub(args.host, args.port, args.latency, args.failure_rate, args.seed)
+    print(f"Fake Context Hub on {fake.url} (CONTEXT_HUB_KEY can be any non-empty value)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
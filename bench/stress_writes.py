@@ -0,0 +1,80 @@
+"""Multi-process write stress test for the storage backends.
+
+Each worker process increments a shared counter decision and inserts its own
+decisions through ``store.run``, the same path the routes use. At the end the
+counter must equal the total number of increments and every insert must be
+present: any lost update fails the run.
+
+    python bench/stress_writes.py --backend json --workers 8 --iterations 50
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import storage  # noqa: E402
+
+COUNTER_ID = "CNT-00"
+
+
+def worker(path, backend, worker_no, iterations):
+    store = storage.open_store(path, backend)
+
+    def increment(tx):
+        current = tx.get(COUNTER_ID)
+        tx.update(COUNTER_ID, {"comment": str(int(current["comment"]) + 1)})
+
+    for i in range(iterations):
+        store.run(increment)
+        store.run(lambda tx, i=i: tx.insert({
+            "id": f"W{worker_no}-{i:04d}", "block": "ops", "decision": f"stress {worker_no}/{i}",
+            "status": "active", "comment": "",
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "decisions.json" if args.backend == "json" else "decisions.db")
+        store = storage.open_store(path, args.backend)
+        store.save({"decisions": [{"id": COUNTER_ID, "block": "ops", "decision": "counter",
+                                   "status": "active", "comment": "0"}], "history": []})
+
+        started = time.perf_counter()
+        procs = [
+            multiprocessing.Process(target=worker, args=(path, args.backend, n, args.iterations))
+            for n in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - started
+
+        if any(p.exitcode != 0 for p in procs):
+            print("FAIL: a worker process crashed")
+            return 1
+
+        data = store.load()
+        expected = args.workers * args.iterations
+        counter = int(next(d for d in data["decisions"] if d["id"] == COUNTER_ID)["comment"])
+        inserted = len(data["decisions"]) - 1
+        lost = (expected - counter) + (expected - inserted)
+        writes = expected * 2
+        print(f"{args.backend}: {args.workers} workers x {args.iterations} iterations, "
+              f"{writes} writes in {elapsed:.2f}s ({writes / elapsed:.0f} writes/s)")
+        print(f"counter={counter}/{expected} inserted={inserted}/{expected} lost={lost}")
+        return 0 if lost == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
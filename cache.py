@@ -0,0 +1,192 @@
+"""Per-worker read-through cache for the tracker data.
+
+The parsed dataset is kept in memory and handed out as a read-only view
+(``FrozenDict`` / tuples), so handlers cannot corrupt the shared copy. It is
+reloaded only when the store's version stamp changes: file inode/mtime/size
+for JSON, the ``meta.version`` counter for SQLite. Writes made by this worker
+are applied to the cached snapshot and its indexes directly.
+"""
+import itertools
+import threading
+from collections import OrderedDict
+
+from deadlines import DeadlineIndex
+from indexes import DecisionIndex
+from search import SearchIndex
+
+
+class FrozenDict(dict):
+    """A dict that refuses mutation but still serialises like a dict."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("cached decision data is read-only; copy it with dict() first")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+
+def freeze(obj):
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+_generations = itertools.count(1)
+
+
+class Snapshot:
+    def __init__(self, data):
+        self.index = DecisionIndex(freeze(d) for d in data.get("decisions", []))
+        # Fragment cache keys: a reload starts a new generation, while an
+        # applied commit only bumps the versions of the blocks it touched.
+        self.generation = next(_generations)
+        self.block_versions = {}
+        self._data = None
+        self._search = None
+        self._deadlines = None
+        self._lazy_lock = threading.Lock()
+
+    @property
+    def deadlines(self):
+        if self._deadlines is None:
+            with self._lazy_lock:
+                if self._deadlines is None:
+                    self._deadlines = DeadlineIndex(self.index.all())
+        return self._deadlines
+
+    def search(self, query):
+        """Ids matching ``query``; the text index is built on first use."""
+        if self._search is None:
+            with self._lazy_lock:
+                if self._search is None:
+                    self._search = SearchIndex(self.index.all())
+        return self._search.search(query)
+
+    def block_version(self, block):
+        return (self.generation, self.block_versions.get(block, 0))
+
+    def _touch(self, *decs):
+        for dec in decs:
+            block = dec.get("block")
+            self.block_versions[block] = self.block_versions.get(block, 0) + 1
+
+    def data(self):
+        if self._data is None:
+            self._data = FrozenDict(decisions=tuple(self.index.all()))
+        return self._data
+
+    def apply(self, changes):
+        for change in changes:
+            if change[0] == "insert":
+                dec = freeze(change[1])
+                if not self.index.add(dec):
+                    continue
+                self._touch(dec)
+                if self._search is not None:
+                    self._search.add(dec)
+                if self._deadlines is not None:
+                    self._deadlines.add(dec)
+            elif change[0] == "update":
+                dec = freeze(change[2])
+                self.index.replace(dec)
+                self._touch(change[1], dec)
+                if self._search is not None:
+                    self._search.add(dec)
+                if self._deadlines is not None:
+                    self._deadlines.replace(change[1], dec)
+        self._data = None
+
+
+class DataCache:
+    def __init__(self, store):
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.applied = 0
+        self._snapshot = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        store.listeners.append(self._on_commit)
+
+    def snapshot(self):
+        stamp = self.store.stamp()
+        with self._lock:
+            if self._snapshot is not None and stamp == self._stamp:
+                self.hits += 1
+                return self._snapshot
+            self.misses += 1
+            data, self._stamp = self.store.load_with_stamp()
+            self._snapshot = Snapshot(data)
+            return self._snapshot
+
+    def get(self):
+        return self.snapshot().data()
+
+    def _on_commit(self, changes, before, after):
+        with self._lock:
+            if self._snapshot is None or changes is None or before != self._stamp:
+                self._snapshot = None
+                self._stamp = None
+                return
+            self._snapshot.apply(changes)
+            self._stamp = after
+            self.applied += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._stamp = None
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "applied": self.applied,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "stamp": self._stamp,
+            "decisions": self._snapshot.index.count() if self._snapshot is not None else None,
+        }
+
+
+class FragmentCache:
+    """Bounded LRU of rendered HTML fragments keyed by snapshot/block version."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
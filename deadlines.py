@@ -0,0 +1,133 @@
+"""Date index for deadline-driven status changes.
+
+``DeadlineIndex`` keeps active decisions in a min-heap by due date (the
+earlier of ``deadline`` and ``check_date``), so finding the decisions that
+have just become overdue costs O(k log n) for k crossings instead of a
+scan. Open decisions are also kept in a sorted list of (date, id, field)
+for range queries such as "check-ins this week".
+
+Each flip records the date it was made for in ``overdue_for``, so only a
+new date crossing flips a decision again.
+
+Heap entries are invalidated lazily: ``due_of`` holds the live due date of
+each active decision, and entries that no longer match it are skipped.
+"""
+import bisect
+import heapq
+import re
+import threading
+
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+DATE_FIELDS = ("deadline", "check_date")
+# Decisions in these statuses show up in upcoming views; only active ones go overdue.
+OPEN_STATUSES = ("active", "overdue", "no_deadline")
+
+
+def _dates(dec):
+    return [(field, dec.get(field)) for field in DATE_FIELDS if DATE_RE.match(dec.get(field) or "")]
+
+
+def due_date(dec):
+    """The date after which an active decision is overdue, or None.
+
+    Dates up to ``overdue_for`` (the last date the decision was already
+    flipped for) do not count again: a decision moved back to active stays
+    active until a later deadline or check date passes.
+    """
+    flipped_for = dec.get("overdue_for") or ""
+    dates = [value for _, value in _dates(dec) if value > flipped_for]
+    return min(dates) if dates else None
+
+
+def crossed_date(dec, today):
+    """The latest deadline or check date of ``dec`` before ``today``, or None."""
+    dates = [value for _, value in _dates(dec) if value < today]
+    return max(dates) if dates else None
+
+
+class DeadlineIndex:
+    def __init__(self, decisions=()):
+        self._lock = threading.RLock()
+        self.heap = []
+        self.due_of = {}
+        self.dates = []
+        for dec in decisions:
+            due = due_date(dec) if dec.get("status") == "active" else None
+            if due:
+                self.due_of[dec["id"]] = due
+                self.heap.append((due, dec["id"]))
+            if dec.get("status") in OPEN_STATUSES:
+                self.dates.extend((value, dec["id"], field) for field, value in _dates(dec))
+        heapq.heapify(self.heap)
+        self.dates.sort()
+
+    def add(self, dec):
+        with self._lock:
+            due = due_date(dec) if dec.get("status") == "active" else None
+            if due:
+                self.due_of[dec["id"]] = due
+                heapq.heappush(self.heap, (due, dec["id"]))
+            if dec.get("status") in OPEN_STATUSES:
+                for field, value in _dates(dec):
+                    bisect.insort(self.dates, (value, dec["id"], field))
+
+    def remove(self, dec):
+        """Drop ``dec`` as it was when indexed."""
+        with self._lock:
+            self.due_of.pop(dec["id"], None)
+            if dec.get("status") in OPEN_STATUSES:
+                for field, value in _dates(dec):
+                    key = (value, dec["id"], field)
+                    i = bisect.bisect_left(self.dates, key)
+                    if i < len(self.dates) and self.dates[i] == key:
+                        del self.dates[i]
+            # Updates leave stale heap entries behind; rebuild once they dominate.
+            if len(self.heap) > 2 * len(self.due_of) + 64:
+                self.heap = [(due, i) for i, due in self.due_of.items()]
+                heapq.heapify(self.heap)
+
+    def replace(self, old, new):
+        with self._lock:
+            self.remove(old)
+            self.add(new)
+
+    def _drop_stale(self):
+        while self.heap and self.due_of.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def next_due(self):
+        with self._lock:
+            self._drop_stale()
+            return self.heap[0][0] if self.heap else None
+
+    def has_due(self, today):
+        due = self.next_due()
+        return due is not None and due < today
+
+    def pop_due(self, today):
+        """Remove and return ids of active decisions due before ``today``.
+
+        The caller flips them in a write; if that write fails it hands the
+        ids back with ``restore`` so the next tick tries again.
+        """
+        found = {}
+        with self._lock:
+            while True:
+                self._drop_stale()
+                if not self.heap or self.heap[0][0] >= today:
+                    return list(found)
+                _, decision_id = heapq.heappop(self.heap)
+                found[decision_id] = None
+
+    def restore(self, ids):
+        with self._lock:
+            for decision_id in ids:
+                if decision_id in self.due_of:
+                    heapq.heappush(self.heap, (self.due_of[decision_id], decision_id))
+
+    def between(self, start, end):
+        """``(date, id, field)`` for open decisions dated ``start``..``end`` inclusive."""
+        with self._lock:
+            lo = bisect.bisect_left(self.dates, (start,))
+            hi = bisect.bisect_right(self.dates, (end, "\uffff"))
+            return self.dates[lo:hi]
@@ -0,0 +1,371 @@
+"""Append-only decision history, kept out of the main data document.
+
+``HistoryLog`` writes JSON lines into time-based segment files
+(``history-2026-02.jsonl`` with monthly rotation), so an append costs one
+small write regardless of how much history exists. ``SqliteHistory`` offers
+the same API on top of the ``history`` table. Both support per-decision
+lookup, compaction of old status changes into per-decision summaries, and
+retention by age.
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+ROTATIONS = {"month": 7, "day": 10}
+
+
+def _period_key(timestamp, rotate):
+    return (timestamp or datetime.now().isoformat())[:ROTATIONS[rotate]]
+
+
+def entry_ids(entry):
+    """Ids of every decision an entry is about; batch entries name several in ``ids``."""
+    ids = [entry["id"]] if entry.get("id") else []
+    for decision_id in entry.get("ids") or ():
+        if decision_id not in ids:
+            ids.append(decision_id)
+    return ids
+
+
+def _status_records(entries):
+    """Status changes and summaries in ``entries``, counting those listed inside batch entries."""
+    total = 0
+    for entry in entries:
+        if entry.get("action") in ("status_change", "status_summary"):
+            total += 1
+        else:
+            total += len(entry.get("status_changes") or ())
+    return total
+
+
+def collapse_status_changes(entries):
+    """Replace each decision's status changes with one ``status_summary``.
+
+    Status changes listed inside batch entries are folded in too and
+    dropped from the batch entry; other actions are kept as they are. The
+    summary records the first ``from`` and last ``to`` status, the number
+    of changes and the time span.
+    """
+    kept, summaries = [], {}
+
+    def fold(decision_id, old, new, timestamp):
+        summary = summaries.get(decision_id)
+        if summary is None:
+            summaries[decision_id] = {
+                "action": "status_summary",
+                "id": decision_id,
+                "from": old,
+                "to": new,
+                "changes": 1,
+                "first_timestamp": timestamp,
+                "timestamp": timestamp,
+            }
+        else:
+            summary["to"] = new
+            summary["changes"] += 1
+            summary["timestamp"] = timestamp
+
+    for entry in entries:
+        if entry.get("action") == "status_change":
+            fold(entry.get("id"), entry.get("from"), entry.get("to"), entry.get("timestamp"))
+        elif entry.get("action") == "status_summary" and entry.get("id") in summaries:
+            summary = summaries[entry["id"]]
+            summary["from"] = entry.get("from")
+            summary["changes"] += entry.get("changes", 1)
+            summary["first_timestamp"] = entry.get("first_timestamp")
+        elif entry.get("status_changes"):
+            for change in entry["status_changes"]:
+                fold(change.get("id"), change.get("from"), change.get("to"), entry.get("timestamp"))
+            kept.append({k: v for k, v in entry.items() if k != "status_changes"})
+        else:
+            kept.append(entry)
+    merged = kept + list(summaries.values())
+    merged.sort(key=lambda e: e.get("timestamp") or "")
+    return merged
+
+
+class HistoryLog:
+    def __init__(self, directory, rotate="month"):
+        if rotate not in ROTATIONS:
+            raise ValueError(f"Unknown HISTORY_ROTATE: {rotate}")
+        self.directory = directory
+        self.rotate = rotate
+        self._lock = threading.Lock()
+        # decision id -> [(segment name, byte offset)], filled incrementally.
+        self._offsets = {}
+        self._scanned = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def segments(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(n for n in os.listdir(self.directory) if n.startswith("history-") and n.endswith(".jsonl"))
+
+    def _segment_key(self, name):
+        return name[len("history-"):-len(".jsonl")]
+
+    def _open_locked(self, name):
+        """Open a segment for append, following a concurrent compaction."""
+        os.makedirs(self.directory, exist_ok=True)
+        while True:
+            f = open(self._path(name), "ab")
+            if fcntl is None:
+                return f
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                same = os.fstat(f.fileno()).st_ino == os.stat(self._path(name)).st_ino
+            except FileNotFoundError:
+                same = False
+            if same:
+                return f
+            f.close()
+
+    def append(self, entries):
+        by_segment = {}
+        for entry in entries:
+            name = f"history-{_period_key(entry.get('timestamp'), self.rotate)}.jsonl"
+            by_segment.setdefault(name, []).append(entry)
+        for name, items in by_segment.items():
+            lines = b"".join(
+                json.dumps(e, ensure_ascii=False, default=str).encode("utf-8") + b"\n" for e in items
+            )
+            with self._open_locked(name) as f:
+                f.write(lines)
+                f.flush()
+
+    def _read_segment(self, name, start=0):
+        """Yield ``(offset, end, entry)`` for each complete line from ``start``."""
+        try:
+            with open(self._path(name), "rb") as f:
+                f.seek(start)
+                offset = start
+                for line in f:
+                    # A line without a newline is still being written.
+                    if not line.endswith(b"\n"):
+                        return
+                    yield offset, offset + len(line), json.loads(line)
+                    offset += len(line)
+        except FileNotFoundError:
+            return
+
+    def _read_backwards(self, name, chunk_size=1 << 16):
+        """Yield the complete lines of a segment newest first, reading from the end."""
+        try:
+            f = open(self._path(name), "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            position = f.seek(0, os.SEEK_END)
+            buffer = b""
+            # Whatever follows the last newline is empty or still being written.
+            tail = True
+            while position > 0:
+                start = max(0, position - chunk_size)
+                f.seek(start)
+                lines = (f.read(position - start) + buffer).split(b"\n")
+                position = start
+                buffer = lines[0]
+                for line in reversed(lines[1:]):
+                    if tail:
+                        tail = False
+                    elif line:
+                        yield line
+            if buffer and not tail:
+                yield buffer
+
+    def _scan(self):
+        """Index lines appended since the last scan; rescan rewritten segments."""
+        with self._lock:
+            names = self.segments()
+            for name in list(self._scanned):
+                if name not in names:
+                    self._forget(name)
+            for name in names:
+                st = os.stat(self._path(name))
+                ino, done = self._scanned.get(name, (st.st_ino, 0))
+                if ino != st.st_ino or st.st_size < done:
+                    self._forget(name)
+                    done = 0
+                if st.st_size == done:
+                    self._scanned[name] = (st.st_ino, done)
+                    continue
+                for offset, end, entry in self._read_segment(name, done):
+                    for decision_id in entry_ids(entry):
+                        self._offsets.setdefault(decision_id, []).append((name, offset))
+                    done = end
+                self._scanned[name] = (st.st_ino, done)
+
+    def _forget(self, name):
+        self._scanned.pop(name, None)
+        for decision_id in list(self._offsets):
+            kept = [p for p in self._offsets[decision_id] if p[0] != name]
+            if kept:
+                self._offsets[decision_id] = kept
+            else:
+                del self._offsets[decision_id]
+
+    def for_decision(self, decision_id):
+        self._scan()
+        with self._lock:
+            # A segment rewritten by compact() is re-indexed after newer ones.
+            positions = sorted(self._offsets.get(decision_id, []))
+        entries = []
+        for name, offset in positions:
+            with open(self._path(name), "rb") as f:
+                f.seek(offset)
+                entries.append(json.loads(f.readline()))
+        return entries
+
+    def recent(self, limit=100, prefix=None):
+        """Newest entries first, optionally only actions starting with ``prefix``."""
+        found = []
+        needle = prefix.encode("utf-8") if prefix else None
+        for name in reversed(self.segments()):
+            for line in self._read_backwards(name):
+                # Only lines that mention the prefix at all are worth parsing.
+                if needle is not None and needle not in line:
+                    continue
+                entry = json.loads(line)
+                if prefix is None or entry.get("action", "").startswith(prefix):
+                    found.append(entry)
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def last(self, prefix=None):
+        entries = self.recent(1, prefix)
+        return entries[0] if entries else None
+
+    def all(self):
+        return [entry for name in self.segments() for _, _, entry in self._read_segment(name)]
+
+    def compact(self, before):
+        """Collapse status changes in segments that end before ``before``."""
+        cutoff = _period_key(before, self.rotate)
+        compacted = 0
+        for name in self.segments():
+            if self._segment_key(name) >= cutoff:
+                continue
+            with self._open_locked(name) as f:
+                entries = [e for _, _, e in self._read_segment(name)]
+                merged = collapse_status_changes(entries)
+                removed = _status_records(entries) - _status_records(merged)
+                if not removed:
+                    continue
+                fd, tmp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=self.directory)
+                with os.fdopen(fd, "wb") as out:
+                    for e in merged:
+                        out.write(json.dumps(e, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp_path, self._path(name))
+                compacted += removed
+        return compacted
+
+    def apply_retention(self, before):
+        """Delete whole segments that end before ``before``."""
+        cutoff = _period_key(before, self.rotate)
+        removed = 0
+        for name in self.segments():
+            if self._segment_key(name) < cutoff:
+                os.remove(self._path(name))
+                removed += 1
+        return removed
+
+
+def history_refs(seq, entry):
+    """``history_refs`` rows for the decisions an entry names besides its own ``id``."""
+    return [(decision_id, seq) for decision_id in entry_ids(entry) if decision_id != entry.get("id")]
+
+
+def insert_history(conn, entries):
+    """Insert entries into the SQLite ``history`` table, with their ``history_refs``."""
+    for entry in entries:
+        seq = conn.execute(
+            "INSERT INTO history (decision_id, action, timestamp, body) VALUES (?, ?, ?, ?)",
+            (entry.get("id"), entry.get("action"), entry.get("timestamp"),
+             json.dumps(entry, ensure_ascii=False, default=str)),
+        ).lastrowid
+        refs = history_refs(seq, entry)
+        if refs:
+            conn.executemany("INSERT INTO history_refs (decision_id, seq) VALUES (?, ?)", refs)
+
+
+class SqliteHistory:
+    """The HistoryLog API over the ``history`` table of a SqliteStore."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def _rows(self, sql, params=()):
+        return [json.loads(r[0]) for r in self.store._conn().execute(sql, params)]
+
+    def append(self, entries):
+        self.store.run(lambda tx: [tx.append_history(e) for e in entries])
+
+    def for_decision(self, decision_id):
+        return self._rows(
+            "SELECT body FROM history WHERE decision_id = ? "
+            "OR seq IN (SELECT seq FROM history_refs WHERE decision_id = ?) ORDER BY timestamp, seq",
+            (decision_id, decision_id),
+        )
+
+    def recent(self, limit=100, prefix=None):
+        if prefix is None:
+            return self._rows("SELECT body FROM history ORDER BY timestamp DESC, seq DESC LIMIT ?", (limit,))
+        return self._rows(
+            "SELECT body FROM history WHERE action LIKE ? ORDER BY timestamp DESC, seq DESC LIMIT ?",
+            (prefix + "%", limit),
+        )
+
+    def last(self, prefix=None):
+        entries = self.recent(1, prefix)
+        return entries[0] if entries else None
+
+    def all(self):
+        return self._rows("SELECT body FROM history ORDER BY timestamp, seq")
+
+    def compact(self, before):
+        conn = self.store._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT seq, body FROM history WHERE timestamp < ? "
+                "AND action IN ('status_change', 'status_summary', 'batch_update') ORDER BY seq",
+                (before,),
+            ).fetchall()
+            entries = [json.loads(body) for _, body in rows]
+            merged = collapse_status_changes(entries)
+            removed = _status_records(entries) - _status_records(merged)
+            if removed:
+                conn.executemany("DELETE FROM history WHERE seq = ?", [(seq,) for seq, _ in rows])
+                conn.executemany("DELETE FROM history_refs WHERE seq = ?", [(seq,) for seq, _ in rows])
+                insert_history(conn, merged)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def apply_retention(self, before):
+        conn = self.store._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM history_refs WHERE seq IN (SELECT seq FROM history WHERE timestamp < ?)", (before,)
+            )
+            removed = conn.execute("DELETE FROM history WHERE timestamp < ?", (before,)).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
@@ -0,0 +1,280 @@
+"""HTTP client and push pipeline for Context Hub.
+
+All calls share one keep-alive ``requests.Session`` with a connection pool
+sized for the push workers. Transient failures (connection errors, 429 and
+5xx gateway responses) are retried with exponential backoff. POSTs are not
+idempotent, so they are retried only when the hub certainly did not act on
+them: the connection could not be made, or the hub answered 429 or 503.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+import metrics
+
+RETRY_STATUSES = {429, 502, 503, 504}
+# Answers that mean the hub did not act on the request; a gateway error may not.
+REFUSED_STATUSES = {429, 503}
+
+
+def _not_sent(error):
+    """True if the request never reached the hub (connect timeout or refused connection)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class HubError(Exception):
+    pass
+
+
+class HubClient:
+    def __init__(self, base_url, key, timeout=15, retries=2, backoff=0.5, pool_size=16):
+        self.base_url = base_url.rstrip("/")
+        self.key = key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update(self.headers())
+                    self._session = session
+        return self._session
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.key}", "Content-Type": "application/json"}
+
+    def request(self, method, path, params=None, payload=None, endpoint=None):
+        """Call the hub and return the decoded JSON, or None on failure.
+
+        ``endpoint`` labels the call in metrics; pass a template such as
+        ``/api/decisions/draft/{id}/confirm`` when ``path`` embeds an id.
+        """
+        endpoint = endpoint or path
+        with metrics.hub_seconds.time(method, endpoint):
+            result, outcome = self._request(method, path, params, payload)
+        metrics.hub_requests.inc(method, endpoint, outcome)
+        return result
+
+    def _request(self, method, path, params, payload):
+        # A POST (draft, confirm) may have been applied even if the answer never
+        # arrived, so it is only retried when the hub refused it or it was never sent.
+        idempotent = method == "GET"
+        retry_statuses = RETRY_STATUSES if idempotent else REFUSED_STATUSES
+        attempt = 0
+        while True:
+            try:
+                r = self.session.request(
+                    method, f"{self.base_url}{path}", params=params, json=payload, timeout=self.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries or not (idempotent or _not_sent(e)):
+                    print(f"[Context Hub {method} {path}] Error: {e}")
+                    return None, "error"
+            else:
+                if r.status_code not in retry_statuses or attempt >= self.retries:
+                    try:
+                        r.raise_for_status()
+                        return r.json(), "ok" if attempt == 0 else "ok_after_retry"
+                    except Exception as e:
+                        print(f"[Context Hub {method} {path}] Error: {e}")
+                        return None, "error"
+            time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+            attempt += 1
+
+    def get(self, path, params=None):
+        return self.request("GET", path, params=params)
+
+    def post(self, path, payload, endpoint=None):
+        return self.request("POST", path, payload=payload, endpoint=endpoint)
+
+
+class CircuitBreaker:
+    """Stop calling a failing hub for ``cooldown`` seconds.
+
+    After ``threshold`` consecutive failures the breaker opens; once the
+    cooldown has passed a single trial call is let through (half-open).
+    """
+
+    def __init__(self, threshold=3, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0
+        return max(0, int(self.cooldown - (time.monotonic() - self.opened_at)))
+
+    def allow(self):
+        return self.state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class StatusCache:
+    """Serve the last-known hub status without waiting on the network.
+
+    ``fetch()`` returns a dict or raises on failure. ``get()`` never blocks:
+    when the value is missing or older than ``ttl`` it starts one background
+    refresh (unless the breaker is open) and returns what it has.
+    """
+
+    def __init__(self, fetch, ttl=60, breaker=None):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.breaker = breaker or CircuitBreaker()
+        self.value = None
+        self.fetched_at = None
+        self.checked_at = None
+        self.error = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            value = self.fetch()
+        except Exception as e:
+            with self._lock:
+                self.error = str(e) or e.__class__.__name__
+                self.checked_at = time.time()
+            self.breaker.record_failure()
+        else:
+            with self._lock:
+                self.value = value
+                self.fetched_at = self.checked_at = time.time()
+                self.error = None
+            self.breaker.record_success()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing or not self.breaker.allow():
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="hub-status", daemon=True).start()
+        return True
+
+    def get(self):
+        now = time.time()
+        if self.checked_at is None or now - self.checked_at >= self.ttl:
+            self.refresh_async()
+        return {
+            "value": self.value,
+            "age": int(now - self.fetched_at) if self.fetched_at else None,
+            "error": self.error,
+            "refreshing": self._refreshing,
+            "breaker": self.breaker.state,
+            "retry_in": self.breaker.retry_in(),
+        }
+
+
+def page_items(result):
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        items = result.get("decisions", result.get("data", []))
+        return items if isinstance(items, list) else None
+    return None
+
+
+def next_cursor(result):
+    if isinstance(result, dict):
+        return result.get("nextCursor") or result.get("next_cursor") or result.get("cursor")
+    return None
+
+
+def iter_pages(client, path, params=None, page_size=200, max_pages=1000):
+    """Yield pages of items from a list endpoint until it is exhausted.
+
+    Uses the hub's ``nextCursor`` when the response has one and falls back to
+    ``offset`` paging otherwise. Raises ``HubError`` if a page cannot be
+    fetched, so the caller never mistakes a failed walk for the end of data.
+    """
+    params = dict(params or {}, limit=page_size)
+    seen_first = set()
+    offset = 0
+    for _ in range(max_pages):
+        result = client.get(path, params)
+        if result is None:
+            raise HubError("Не удалось подключиться к Context Hub")
+        items = page_items(result)
+        if items is None:
+            raise HubError("Неожиданный формат ответа")
+        if not items:
+            return
+        # A hub that ignores offset would return the same page forever.
+        first = items[0].get("id") if isinstance(items[0], dict) else None
+        if first in seen_first:
+            return
+        seen_first.add(first)
+        yield items
+
+        cursor = next_cursor(result)
+        if cursor:
+            params["cursor"] = cursor
+        elif len(items) < page_size:
+            return
+        else:
+            offset += len(items)
+            params["offset"] = offset
+
+
+def push_all(items, push_one, on_pushed, workers=8):
+    """Run ``push_one(item)`` for every item on a bounded thread pool.
+
+    ``push_one`` returns the hub id, or None if any stage failed. Results are
+    handed to ``on_pushed(item, hub_id)`` in the calling thread as each push
+    completes, so progress can be saved before the rest finish.
+    """
+    pushed = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(push_one, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                hub_id = future.result()
+            except Exception as e:
+                print(f"[Context Hub push] Error: {e}")
+                continue
+            if hub_id:
+                on_pushed(futures[future], hub_id)
+                pushed += 1
+    return pushed
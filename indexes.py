@@ -0,0 +1,178 @@
+"""In-memory secondary indexes over the decision list.
+
+``DecisionIndex`` keeps by-status and by-block buckets, per-block counts and
+the ``hub_id`` / normalised-title sets used by sync, and is updated on every
+insert/update instead of being rebuilt from a full scan.
+"""
+import threading
+from collections import Counter
+
+
+def title_key(title):
+    return (title or "").lower().strip()
+
+
+def updated_at(dec):
+    # Decisions written before updated_at existed fall back to their creation date.
+    return dec.get("updated_at") or dec.get("date_created") or ""
+
+
+class DecisionIndex:
+    def __init__(self, decisions=()):
+        self._lock = threading.RLock()
+        self._next_pos = 0
+        self.by_id = {}
+        self._pos = {}
+        self.by_status = {}
+        self.by_block = {}
+        self.hub_of = {}
+        self.by_hub_id = {}
+        self.titles = Counter()
+        self.last_modified = ""
+        for dec in decisions:
+            self.add(dec)
+
+    def _link(self, dec):
+        decision_id = dec["id"]
+        self.by_status.setdefault(dec.get("status"), {})[decision_id] = None
+        self.by_block.setdefault(dec.get("block"), {})[decision_id] = None
+        if dec.get("hub_id"):
+            self.hub_of[decision_id] = dec["hub_id"]
+            self.by_hub_id.setdefault(dec["hub_id"], {})[decision_id] = None
+        self.titles[title_key(dec.get("decision"))] += 1
+        self.last_modified = max(self.last_modified, updated_at(dec))
+
+    def _unlink(self, dec):
+        decision_id = dec["id"]
+        self.by_status.get(dec.get("status"), {}).pop(decision_id, None)
+        self.by_block.get(dec.get("block"), {}).pop(decision_id, None)
+        hub_id = self.hub_of.pop(decision_id, None)
+        if hub_id:
+            ids = self.by_hub_id.get(hub_id, {})
+            ids.pop(decision_id, None)
+            if not ids:
+                self.by_hub_id.pop(hub_id, None)
+        key = title_key(dec.get("decision"))
+        self.titles[key] -= 1
+        if self.titles[key] <= 0:
+            del self.titles[key]
+
+    def add(self, dec):
+        with self._lock:
+            # Legacy JSON files may repeat an id; only the first was ever
+            # reachable through /update, so later copies are not indexed.
+            if dec["id"] in self.by_id:
+                return False
+            self.by_id[dec["id"]] = dec
+            self._pos[dec["id"]] = self._next_pos
+            self._next_pos += 1
+            self._link(dec)
+            return True
+
+    def replace(self, dec):
+        """Swap in a new version of an indexed decision, keeping its position."""
+        with self._lock:
+            old = self.by_id.get(dec["id"])
+            if old is None:
+                return self.add(dec)
+            self._unlink(old)
+            self.by_id[dec["id"]] = dec
+            self._link(dec)
+            return True
+
+    def reindex(self, old, new):
+        """Re-bucket a decision that was mutated in place (``old`` is a copy)."""
+        with self._lock:
+            self._unlink(old)
+            self.by_id[new["id"]] = new
+            self._link(new)
+
+    def get(self, decision_id):
+        return self.by_id.get(decision_id)
+
+    def all(self):
+        with self._lock:
+            return list(self.by_id.values())
+
+    def count(self, block=None, status=None):
+        with self._lock:
+            if block is None and status is None:
+                return len(self.by_id)
+            if status is None:
+                return len(self.by_block.get(block, ()))
+            if block is None:
+                return len(self.by_status.get(status, ()))
+            return len(self.filter(block, status))
+
+    def stats(self):
+        with self._lock:
+            counts = {status: len(ids) for status, ids in self.by_status.items()}
+            counts["total"] = len(self.by_id)
+            return counts
+
+    def filter(self, block=None, status=None):
+        """Decisions matching ``block``/``status`` in their original order."""
+        with self._lock:
+            if block is None and status is None:
+                return list(self.by_id.values())
+            buckets = []
+            if block is not None:
+                buckets.append(self.by_block.get(block, {}))
+            if status is not None:
+                buckets.append(self.by_status.get(status, {}))
+            smallest = min(buckets, key=len)
+            ids = [i for i in smallest if all(i in b for b in buckets)]
+            ids.sort(key=self._pos.__getitem__)
+            return [self.by_id[i] for i in ids]
+
+    def position(self, decision_id):
+        return self._pos.get(decision_id)
+
+    def query(self, block=None, status=None, responsible=None, deadline_from=None, deadline_to=None,
+              updated_since=None, after=None, ids=None):
+        """``filter`` plus substring/range predicates and a position cursor.
+
+        Bucketed fields (or ``ids``, e.g. full-text matches) narrow the
+        candidates first; the remaining predicates only look at those.
+        ``after`` skips decisions up to that position.
+        """
+        if ids is not None:
+            with self._lock:
+                found = sorted((i for i in ids if i in self.by_id), key=self._pos.__getitem__)
+                candidates = [self.by_id[i] for i in found]
+            candidates = [
+                d for d in candidates
+                if (block is None or d.get("block") == block) and (status is None or d.get("status") == status)
+            ]
+        else:
+            candidates = self.filter(block, status)
+        needle = responsible.lower() if responsible else None
+        result = []
+        for dec in candidates:
+            if after is not None and self._pos[dec["id"]] <= after:
+                continue
+            if needle and needle not in (dec.get("responsible") or "").lower():
+                continue
+            deadline = dec.get("deadline") or ""
+            if deadline_from and (not deadline or deadline < deadline_from):
+                continue
+            if deadline_to and (not deadline or deadline > deadline_to):
+                continue
+            if updated_since and updated_at(dec) < updated_since:
+                continue
+            result.append(dec)
+        return result
+
+    def linked_count(self):
+        return len(self.hub_of)
+
+    def has_hub_id(self, hub_id):
+        return hub_id in self.by_hub_id
+
+    def find_by_hub_id(self, hub_id):
+        with self._lock:
+            ids = self.by_hub_id.get(hub_id)
+            return self.by_id[next(iter(ids))] if ids else None
+
+    def has_title(self, title):
+        return title_key(title) in self.titles
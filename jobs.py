@@ -0,0 +1,260 @@
+"""Background job queue for Context Hub syncs.
+
+Jobs live in a small SQLite database so that every gunicorn worker shares
+one queue and queued work survives restarts. Each worker process runs one
+daemon thread that claims jobs atomically, so a job runs exactly once no
+matter how many processes poll. Only one job of a kind can be queued or
+running at a time: enqueueing a duplicate returns the existing job.
+
+Kinds that must not overlap share a ``lock_key`` (all syncs push, so they
+share one): a queued job waits until no job with its key is running.
+A running job is kept alive by a heartbeat from the worker executing it;
+when the heartbeat stops (the process died) the job is marked failed and
+the key is released.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from storage import ensure_dir
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    result TEXT,
+    error TEXT,
+    lock_key TEXT,
+    heartbeat_at REAL
+);
+CREATE TABLE IF NOT EXISTS schedule (
+    kind TEXT PRIMARY KEY,
+    last_enqueued REAL NOT NULL
+);
+"""
+
+JOBS_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_kind ON jobs (kind)
+    WHERE status IN ('queued', 'running');
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_running_lock ON jobs (lock_key)
+    WHERE status = 'running';
+"""
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def _job_dict(row):
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+class JobQueue:
+    """``lock_keys`` maps a kind to its exclusive key; other kinds use their own name."""
+
+    def __init__(self, path, lock_keys=None, heartbeat_interval=10):
+        self.path = path
+        self.lock_keys = lock_keys or {}
+        self.heartbeat_interval = heartbeat_interval
+        # A running job is lost after this many seconds without a heartbeat.
+        self.stale_after = heartbeat_interval * 6
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            ensure_dir(self.path)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(JOBS_SCHEMA)
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("lock_key", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("UPDATE jobs SET lock_key = kind WHERE lock_key IS NULL")
+            conn.executescript(JOBS_INDEXES)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def enqueue(self, kind):
+        """Queue a job of ``kind``; returns ``(job, created)``."""
+        conn = self._conn()
+        job_id = uuid.uuid4().hex[:12]
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, created_at, lock_key) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, _now(), self.lock_keys.get(kind, kind)),
+            )
+            return self.get(job_id), True
+        except sqlite3.IntegrityError:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND status IN ('queued', 'running')", (kind,)
+            ).fetchone()
+            if row is None:
+                # The active job finished between the insert and the lookup.
+                return self.enqueue(kind)
+            return _job_dict(row), False
+
+    def enqueue_if_due(self, kind, interval):
+        """Queue ``kind`` if it was last scheduled ``interval`` seconds ago or more."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT last_enqueued FROM schedule WHERE kind = ?", (kind,)).fetchone()
+            due = row is None or now - row[0] >= interval
+            if due:
+                conn.execute("INSERT OR REPLACE INTO schedule (kind, last_enqueued) VALUES (?, ?)", (kind, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.enqueue(kind) if due else (None, False)
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def active(self, kind=None):
+        sql = "SELECT * FROM jobs WHERE status IN ('queued', 'running')"
+        params = ()
+        if kind:
+            sql += " AND kind = ?"
+            params = (kind,)
+        return [_job_dict(r) for r in self._conn().execute(sql + " ORDER BY created_at", params)]
+
+    def recent(self, limit=10):
+        rows = self._conn().execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [_job_dict(r) for r in rows]
+
+    def claim(self):
+        """Atomically move the oldest runnable queued job to ``running`` and return it.
+
+        A queued job is runnable when no job with the same lock key is running.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A worker process that died mid-job stops beating and would hold its key forever.
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = 'worker lost' "
+                "WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (_now(), time.time() - self.stale_after),
+            )
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' AND lock_key NOT IN "
+                "(SELECT lock_key FROM jobs WHERE status = 'running') ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (_now(), time.time(), row[0]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0]) if row else None
+
+    def heartbeat(self, job_id):
+        self._conn().execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = 'running'", (time.time(), job_id)
+        )
+
+    def finish(self, job_id, result):
+        self._conn().execute(
+            "UPDATE jobs SET status = 'done', finished_at = ?, result = ? WHERE id = ?",
+            (_now(), json.dumps(result, ensure_ascii=False, default=str), job_id),
+        )
+
+    def fail(self, job_id, error):
+        self._conn().execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+            (_now(), str(error), job_id),
+        )
+
+
+class JobWorker:
+    """Daemon thread that runs queued jobs and optional scheduled ones.
+
+    ``handlers`` maps a job kind to a callable returning a JSON-serialisable
+    result. ``schedule`` maps a kind to an interval in seconds.
+    """
+
+    def __init__(self, queue, handlers, poll_interval=1.0, schedule=None):
+        self.queue = queue
+        self.handlers = handlers
+        self.poll_interval = poll_interval
+        self.schedule = schedule or {}
+        self._thread = None
+        self._pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        # Threads do not survive a fork, so each gunicorn worker starts its own.
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name="job-worker", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def run_pending(self):
+        """Run queued jobs until the queue is empty; returns how many ran."""
+        ran = 0
+        while True:
+            job = self.queue.claim()
+            if job is None:
+                return ran
+            handler = self.handlers.get(job["kind"])
+            stop = threading.Event()
+            beat = threading.Thread(target=self._heartbeat, args=(job["id"], stop), daemon=True)
+            beat.start()
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job kind: {job['kind']}")
+                self.queue.finish(job["id"], handler())
+            except Exception as e:
+                print(f"[jobs] {job['kind']} {job['id']} failed: {e}")
+                self.queue.fail(job["id"], e)
+            finally:
+                stop.set()
+            ran += 1
+
+    def _heartbeat(self, job_id, stop):
+        while not stop.wait(self.queue.heartbeat_interval):
+            try:
+                self.queue.heartbeat(job_id)
+            except Exception as e:
+                print(f"[jobs] heartbeat for {job_id} failed: {e}")
+
+    def _loop(self):
+        while True:
+            try:
+                for kind, interval in self.schedule.items():
+                    if interval > 0:
+                        self.queue.enqueue_if_due(kind, interval)
+                self.run_pending()
+            except Exception as e:
+                print(f"[jobs] worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
@@ -0,0 +1,115 @@
+"""Parse the decision tables of ``decision_tracker.md`` into decisions.
+
+The file has one section per block (``## Блок 1: ...``) plus ``## Открытые
+вопросы``, each with a Markdown table. Dates are written as ``24.02`` or
+``~24.03`` without a year; the year is taken from the title line.
+"""
+import re
+from datetime import date
+
+SECTION_BLOCKS = ["structure", "sales", "coo", "finance", "ops"]
+OPEN_SECTION = "Открытые вопросы"
+
+COLUMNS = {
+    "Решение": "decision",
+    "Вопрос": "decision",
+    "Дата": "date",
+    "Поднят": "date",
+    "Ответственный": "responsible",
+    "Кто решает": "responsible",
+    "Срок": "deadline",
+    "Контрольная точка": "check",
+    "Статус": "status",
+    "Блокирует": "blocks",
+}
+
+STATUS_EMOJI = {"🟢": "done", "🟡": "active", "🟠": "no_deadline", "🔴": "overdue", "⏳": "deferred"}
+
+DAY_MONTH_RE = re.compile(r"\b(\d{1,2})\.(\d{2})\b")
+YEAR_RE = re.compile(r"\b(20\d{2})\b")
+
+
+def clean(text):
+    return re.sub(r"\s+", " ", text.replace("**", "").replace("❗", "")).strip(" —-")
+
+
+def find_date(text, year):
+    m = DAY_MONTH_RE.search(text or "")
+    if not m:
+        return ""
+    try:
+        return date(year, int(m.group(2)), int(m.group(1))).isoformat()
+    except ValueError:
+        return ""
+
+
+def parse_status(text):
+    for emoji, status in STATUS_EMOJI.items():
+        if emoji in text:
+            return status
+    return "active"
+
+
+def split_row(line):
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def row_to_decision(block, row, year, source):
+    decision = clean(row.get("decision", ""))
+    if not decision:
+        return None
+    created = find_date(row.get("date"), year)
+    deadline = find_date(row.get("deadline"), year)
+    check = row.get("check", "")
+    comment = []
+    if row.get("deadline") and not deadline:
+        comment.append(f"Срок: {clean(row['deadline'])}")
+    if clean(check):
+        comment.append(clean(check))
+    if row.get("blocks"):
+        comment.append(f"Блокирует: {clean(row['blocks'])}")
+    return {
+        "block": block,
+        "decision": decision,
+        "responsible": clean(row.get("responsible", "")),
+        "deadline": deadline,
+        "check_date": find_date(check, year),
+        "status": parse_status(row["status"]) if "status" in row else "no_deadline",
+        "comment": "; ".join(c for c in comment if c),
+        "date_created": created,
+        "source": f"{source} {created[8:10]}.{created[5:7]}" if created else source,
+    }
+
+
+def parse_decision_tracker(text, source="Встреча"):
+    """Return decisions from every block and open-question table in ``text``."""
+    year_match = YEAR_RE.search(text)
+    year = int(year_match.group(1)) if year_match else date.today().year
+    decisions = []
+    block = None
+    header = None
+    for line in text.splitlines():
+        if line.startswith("## "):
+            title = line[3:]
+            m = re.match(r"Блок (\d+)", title)
+            if m and 1 <= int(m.group(1)) <= len(SECTION_BLOCKS):
+                block = SECTION_BLOCKS[int(m.group(1)) - 1]
+            elif title.startswith(OPEN_SECTION):
+                block = "open"
+            else:
+                block = None
+            header = None
+            continue
+        if block is None or not line.startswith("|"):
+            continue
+        cells = split_row(line)
+        if header is None:
+            header = [COLUMNS.get(cell) for cell in cells]
+            continue
+        if all(set(cell) <= set("-: ") for cell in cells):
+            continue
+        row = {field: cell for field, cell in zip(header, cells) if field}
+        dec = row_to_decision(block, row, year, source)
+        if dec:
+            decisions.append(dec)
+    return decisions
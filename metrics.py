@@ -0,0 +1,149 @@
+"""In-process metrics in the Prometheus text format.
+
+A small registry of labelled counters and histograms, so the tracker can
+expose ``/metrics`` without extra dependencies. Values are per process:
+with several gunicorn workers each one reports its own, and a scrape hits
+whichever worker answers.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760, 104857600)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _labels(self.label_names, k), v) for k, v in sorted(self.values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., sum, count]
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            row = self.values.get(labels)
+            if row is None:
+                row = self.values[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, row in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, row):
+                    out.append((self.name + "_bucket", _labels(self.label_names, key, [("le", bound)]), count))
+                out.append((self.name + "_bucket", _labels(self.label_names, key, [("le", "+Inf")]), row[-1]))
+                out.append((self.name + "_sum", _labels(self.label_names, key), round(row[-2], 6)))
+                out.append((self.name + "_count", _labels(self.label_names, key), row[-1]))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge_collector(self, fn):
+        """Register ``fn()`` returning ``[(name, help, labels dict, value)]`` at scrape time."""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name}{labels} {value}" for name, labels, value in metric.samples())
+        seen = set()
+        for collect in self.collectors:
+            try:
+                gauges = collect()
+            except Exception as e:
+                print(f"[metrics] collector failed: {e}")
+                continue
+            for name, help, labels, value in gauges:
+                if value is None:
+                    continue
+                if name not in seen:
+                    seen.add(name)
+                    lines.append(f"# HELP {name} {help}")
+                    lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name}{_labels(labels.keys(), labels.values())} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+storage_seconds = REGISTRY.histogram(
+    "tracker_storage_seconds", "Time spent reading or writing the data store.", ("backend", "op"),
+)
+storage_bytes = REGISTRY.histogram(
+    "tracker_storage_bytes", "Bytes read or written per data store load/save.", ("backend", "op"), BYTE_BUCKETS,
+)
+hub_requests = REGISTRY.counter(
+    "tracker_hub_requests_total", "Context Hub calls by endpoint and outcome.", ("method", "endpoint", "outcome"),
+)
+hub_seconds = REGISTRY.histogram(
+    "tracker_hub_request_seconds", "Context Hub call latency, including retries.", ("method", "endpoint"),
+)
+http_seconds = REGISTRY.histogram(
+    "tracker_http_request_seconds", "Request latency by route.", ("method", "route", "status"),
+)
@@ -0,0 +1,101 @@
+"""Full-text search over decisions.
+
+``SearchIndex`` is an inverted index from stemmed tokens to decision ids
+over the ``decision``, ``comment``, ``responsible``, ``source`` and ``tags``
+fields. Text is case-folded with ``ё`` folded to ``е``, and Russian words
+lose their inflectional ending, so "эскалация", "эскалации" and "эскалацию"
+all match each other. A query matches decisions containing every token.
+"""
+import re
+import threading
+from functools import lru_cache
+
+SEARCH_FIELDS = ("decision", "comment", "responsible", "source", "tags")
+
+WORD_RE = re.compile(r"\w+")
+CYRILLIC_RE = re.compile(r"[а-я]")
+MIN_STEM = 3
+
+ENDINGS = frozenset([
+    "ениями", "ением", "ениям", "ениях", "ения", "ение", "ении", "ению",
+    "остями", "остью", "остей", "ость", "ости",
+    "иями", "ями", "ами", "иях", "иям", "ией",
+    "ого", "его", "ому", "ему", "ыми", "ими", "ую", "юю",
+    "ать", "ять", "ить", "еть", "ует", "уют", "ала", "ила", "ыла", "али", "или",
+    "ые", "ие", "ое", "ее", "ый", "ий", "ой", "ая", "яя",
+    "ом", "ем", "ам", "ям", "ах", "ях", "ей", "ов", "ев",
+    "ия", "ию", "ии", "ья", "ье", "ью",
+    "а", "я", "о", "е", "и", "ы", "у", "ю", "ь", "й",
+])
+ENDING_LENGTHS = sorted({len(e) for e in ENDINGS}, reverse=True)
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Strip the longest inflectional ending from a Russian word; leave others alone."""
+    if not CYRILLIC_RE.search(word):
+        return word
+    for length in ENDING_LENGTHS:
+        if len(word) - length >= MIN_STEM and word[-length:] in ENDINGS:
+            return word[:-length]
+    return word
+
+
+def tokenize(text):
+    return [stem(w) for w in WORD_RE.findall(text.casefold().replace("ё", "е"))]
+
+
+def decision_text(dec):
+    parts = []
+    for field in SEARCH_FIELDS:
+        value = dec.get(field)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+class SearchIndex:
+    def __init__(self, decisions=()):
+        self._lock = threading.RLock()
+        self.postings = {}
+        self.tokens_of = {}
+        for dec in decisions:
+            self.add(dec)
+
+    def add(self, dec):
+        with self._lock:
+            self.remove(dec["id"])
+            tokens = set(tokenize(decision_text(dec)))
+            self.tokens_of[dec["id"]] = tokens
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(dec["id"])
+
+    def remove(self, decision_id):
+        with self._lock:
+            for token in self.tokens_of.pop(decision_id, ()):
+                ids = self.postings.get(token)
+                if ids is not None:
+                    ids.discard(decision_id)
+                    if not ids:
+                        del self.postings[token]
+
+    def search(self, query):
+        """Ids of decisions containing every token of ``query``.
+
+        Returns None for a query with no searchable tokens, so callers can
+        tell "no filter" from "no matches".
+        """
+        tokens = set(tokenize(query or ""))
+        if not tokens:
+            return None
+        with self._lock:
+            postings = [self.postings.get(t, set()) for t in tokens]
+            postings.sort(key=len)
+            result = set(postings[0])
+            for ids in postings[1:]:
+                result &= ids
+                if not result:
+                    break
+            return result
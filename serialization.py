@@ -0,0 +1,110 @@
+"""Encoding of the whole-document data file.
+
+``Codec(fmt, compression)`` turns the data dict into bytes and back:
+
+- ``json``: compact JSON, written with orjson when it is installed and the
+  stdlib otherwise (both produce the same kind of file);
+- ``pretty``: the original indented JSON, for files meant to be read by people;
+- ``msgpack``: binary MessagePack, needs the ``msgpack`` package;
+
+optionally wrapped in ``gzip`` or ``zstd`` (needs ``zstandard``) compression.
+``loads`` does not need to know how a file was written: compression and
+format are detected from the first bytes, so a file converted to another
+format keeps loading, and so do files from before this module existed.
+"""
+import gzip
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATS = ("json", "pretty", "msgpack")
+COMPRESSIONS = ("", "gzip", "zstd")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class Codec:
+    def __init__(self, fmt="json", compression="", level=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown DATA_FORMAT: {fmt} (expected one of {', '.join(FORMATS)})")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown DATA_COMPRESSION: {compression} (expected gzip or zstd)")
+        if fmt == "msgpack" and msgpack is None:
+            raise ValueError("DATA_FORMAT=msgpack requires the msgpack package")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("DATA_COMPRESSION=zstd requires the zstandard package")
+        self.format = fmt
+        self.compression = compression
+        self.level = level
+
+    def __repr__(self):
+        return f"Codec({self.format!r}, {self.compression!r})"
+
+    def encode(self, data):
+        if self.format == "msgpack":
+            return msgpack.packb(data, default=str, use_bin_type=True)
+        if self.format == "pretty":
+            return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+        if orjson is not None:
+            return orjson.dumps(data, default=str)
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+    def dumps(self, data):
+        raw = self.encode(data)
+        if self.compression == "gzip":
+            # mtime=0 keeps the output identical for identical data.
+            return gzip.compress(raw, compresslevel=self.level or 6, mtime=0)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(raw)
+        return raw
+
+
+def _unwrap(raw):
+    if raw.startswith(GZIP_MAGIC):
+        return "gzip", gzip.decompress(raw)
+    if raw.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError("the data file is zstd-compressed; install the zstandard package to read it")
+        return "zstd", zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return "", raw
+
+
+def _is_json(raw):
+    return raw.lstrip()[:1] in (b"{", b"[")
+
+
+def detect(raw):
+    """Return ``(format, compression)`` of an encoded document."""
+    compression, raw = _unwrap(raw)
+    if not _is_json(raw):
+        return "msgpack", compression
+    # Indented JSON breaks the line right after the opening bracket.
+    return ("pretty" if raw.lstrip()[1:2] in (b"\n", b"\r") else "json"), compression
+
+
+def describe(fmt, compression=""):
+    return fmt + ("+" + compression if compression else "")
+
+
+def loads(raw):
+    """Decode a document written by any ``Codec``."""
+    _, raw = _unwrap(raw)
+    if _is_json(raw):
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    if msgpack is None:
+        raise ValueError("the data file is MessagePack; install the msgpack package to read it")
+    return msgpack.unpackb(raw, raw=False)
@@ -0,0 +1,569 @@
+"""Storage backends for the decision tracker.
+
+JsonStore keeps the decisions in one JSON document and the history in an
+append-only segmented log next to it. SqliteStore keeps one row per decision
+and per history entry, so a write touches only the rows it changes. Both
+expose the same API: whole-document ``load``/``save``, ``run(fn)``, which
+calls ``fn(tx)`` inside a single write transaction, and ``history``.
+"""
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import metrics
+import serialization
+from history import HistoryLog, SqliteHistory, history_refs, insert_history
+from indexes import DecisionIndex, title_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+OPTIMISTIC_RETRIES = 5
+
+
+class DuplicateIdError(ValueError):
+    pass
+
+
+def _stamp_updated(dec, keep=False):
+    # Inserts keep an existing stamp so imports and migrations preserve it.
+    if not (keep and dec.get("updated_at")):
+        dec["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    return dec
+
+
+def ensure_dir(path):
+    data_dir = os.path.dirname(path)
+    if data_dir and not os.path.exists(data_dir):
+        os.makedirs(data_dir, exist_ok=True)
+
+
+class JsonTransaction:
+    def __init__(self, data):
+        self.data = data
+        self.index = DecisionIndex(data["decisions"])
+        self.changes = []
+        self.history = []
+
+    def get(self, decision_id):
+        return self.index.get(decision_id)
+
+    def decisions(self, block=None, status=None):
+        return self.index.filter(block, status)
+
+    def count(self, block=None):
+        return self.index.count(block)
+
+    def has_hub_id(self, hub_id):
+        return self.index.has_hub_id(hub_id)
+
+    def find_by_hub_id(self, hub_id):
+        return self.index.find_by_hub_id(hub_id)
+
+    def get_meta(self, key, default=None):
+        return self.data.get("meta", {}).get(key, default)
+
+    def set_meta(self, key, value):
+        self.data.setdefault("meta", {})[key] = value
+
+    def has_title(self, title):
+        return self.index.has_title(title)
+
+    def insert(self, dec):
+        _stamp_updated(dec, keep=True)
+        if not self.index.add(dec):
+            raise DuplicateIdError(dec["id"])
+        self.data["decisions"].append(dec)
+        self.changes.append(("insert", dec))
+
+    def update(self, decision_id, changes):
+        d = self.index.get(decision_id)
+        if d is None:
+            return None
+        old = dict(d)
+        d.update(changes)
+        _stamp_updated(d)
+        self.index.reindex(old, d)
+        self.changes.append(("update", old, d))
+        return old, dict(d)
+
+    def append_history(self, entry):
+        self.history.append(entry)
+        self.changes.append(("history", entry))
+
+
+class JsonStore:
+    """Whole-document JSON file, safe to share between gunicorn workers.
+
+    Every write goes to a temp file that is fsynced and then swapped in with
+    ``os.replace``, under an exclusive ``flock`` on ``<path>.lock``. Readers
+    never take the lock: they always see either the old or the new file.
+    History entries are appended to ``<root>.history/`` after the commit.
+    """
+    backend = "json"
+
+    def __init__(self, path, history_rotate="month", codec=None):
+        self.path = path
+        self.codec = codec or serialization.Codec()
+        self.lock_path = path + ".lock"
+        self.listeners = []
+        self.history = HistoryLog(os.path.splitext(path)[0] + ".history", history_rotate)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        ensure_dir(self.lock_path)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        with metrics.storage_seconds.time("json", "load"), open(self.path, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = serialization.loads(f.read())
+        metrics.storage_bytes.observe(st.st_size, "json", "load")
+        return data, (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _notify(self, changes, before, after):
+        for listener in self.listeners:
+            listener(changes, before, after)
+
+    def _write(self, data):
+        with metrics.storage_seconds.time("json", "save"):
+            self._write_file(data)
+
+    def _write_file(self, data, codec=None):
+        data["version"] = data.get("version", 0) + 1
+        payload = (codec or self.codec).dumps(data)
+        ensure_dir(self.path)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+            dir=os.path.dirname(self.path) or ".",
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            metrics.storage_bytes.observe(len(payload), "json", "save")
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(self.path) or ".", os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def load(self):
+        return self._read()[0]
+
+    def load_with_stamp(self):
+        return self._read()
+
+    def read_meta(self, key, default=None):
+        if not self.exists():
+            return default
+        return self.load().get("meta", {}).get(key, default)
+
+    def save(self, data):
+        data = dict(data)
+        history = data.pop("history", None)
+        with self._locked():
+            self._write(data)
+        if history:
+            self.history.append(history)
+        self._notify(None, None, self.stamp())
+
+    def convert(self, codec):
+        """Rewrite the data file with ``codec``; returns ``(old size, new size)``."""
+        with self._locked():
+            before = os.path.getsize(self.path)
+            data, _ = self._read()
+            with metrics.storage_seconds.time("json", "save"):
+                self._write_file(data, codec)
+        self.codec = codec
+        self._notify(None, None, self.stamp())
+        return before, os.path.getsize(self.path)
+
+    def migrate_history(self):
+        """Move a legacy in-document ``history`` list into the segmented log."""
+        if not self.exists():
+            return 0
+        with self._locked():
+            data, _ = self._read()
+            if "history" not in data:
+                return 0
+            history = data.pop("history")
+            self.history.append(history)
+            self._write(data)
+        if history:
+            print(f"[storage] Moved {len(history)} history entries to {self.history.directory}")
+        return len(history)
+
+    def run(self, fn, retries=OPTIMISTIC_RETRIES):
+        """Read-modify-write with an optimistic version check.
+
+        ``fn`` may be called more than once and must not depend on state left
+        over from a previous attempt. If the file changed between the read and
+        the write, the attempt is retried with backoff; after ``retries``
+        conflicts the lock is held for the whole cycle so the write always
+        lands.
+        """
+        for attempt in range(retries):
+            data, stamp = self._read()
+            tx = JsonTransaction(data)
+            result = fn(tx)
+            with self._locked():
+                if self.stamp() == stamp:
+                    self._write(data)
+                    after = self.stamp()
+                    break
+            time.sleep(random.uniform(0, 0.005 * 2 ** attempt))
+        else:
+            with self._locked():
+                data, stamp = self._read()
+                tx = JsonTransaction(data)
+                result = fn(tx)
+                self._write(data)
+                after = self.stamp()
+        if tx.history:
+            self.history.append(tx.history)
+        self._notify(tx.changes, stamp, after)
+        return result
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    hub_id TEXT,
+    block TEXT,
+    status TEXT,
+    deadline TEXT,
+    check_date TEXT,
+    title_key TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_hub_id ON decisions (hub_id);
+CREATE INDEX IF NOT EXISTS idx_decisions_block ON decisions (block);
+CREATE INDEX IF NOT EXISTS idx_decisions_status ON decisions (status);
+CREATE INDEX IF NOT EXISTS idx_decisions_deadline ON decisions (deadline);
+CREATE INDEX IF NOT EXISTS idx_decisions_title_key ON decisions (title_key);
+CREATE TABLE IF NOT EXISTS history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    decision_id TEXT,
+    action TEXT,
+    timestamp TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_decision_id ON history (decision_id);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+-- Further decisions a history entry is about (batch entries list several).
+CREATE TABLE IF NOT EXISTS history_refs (
+    decision_id TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_refs_decision_id ON history_refs (decision_id);
+CREATE INDEX IF NOT EXISTS idx_history_refs_seq ON history_refs (seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+INSERT_DECISION_SQL = (
+    "INSERT INTO decisions (id, hub_id, block, status, deadline, check_date, title_key, body) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _decision_row(dec):
+    return (
+        dec["id"], dec.get("hub_id") or None, dec.get("block"), dec.get("status"),
+        dec.get("deadline") or "", dec.get("check_date") or "", title_key(dec.get("decision")),
+        _dumps(dec),
+    )
+
+
+class SqliteTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+        self.changes = []
+
+    def get(self, decision_id):
+        row = self.conn.execute("SELECT body FROM decisions WHERE id = ?", (decision_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def decisions(self, block=None, status=None):
+        sql = "SELECT body FROM decisions"
+        clauses, params = [], []
+        if block is not None:
+            clauses.append("block = ?")
+            params.append(block)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq"
+        return [json.loads(r[0]) for r in self.conn.execute(sql, params)]
+
+    def count(self, block=None):
+        if block is None:
+            return self.conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM decisions WHERE block = ?", (block,)).fetchone()[0]
+
+    def has_hub_id(self, hub_id):
+        return self.conn.execute("SELECT 1 FROM decisions WHERE hub_id = ? LIMIT 1", (hub_id,)).fetchone() is not None
+
+    def find_by_hub_id(self, hub_id):
+        row = self.conn.execute(
+            "SELECT body FROM decisions WHERE hub_id = ? ORDER BY seq LIMIT 1", (hub_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, _dumps(value)))
+
+    def has_title(self, title):
+        return self.conn.execute(
+            "SELECT 1 FROM decisions WHERE title_key = ? LIMIT 1", (title_key(title),)
+        ).fetchone() is not None
+
+    def insert(self, dec):
+        _stamp_updated(dec, keep=True)
+        try:
+            self.conn.execute(INSERT_DECISION_SQL, _decision_row(dec))
+        except sqlite3.IntegrityError:
+            raise DuplicateIdError(dec["id"])
+        self.changes.append(("insert", dec))
+
+    def update(self, decision_id, changes):
+        old = self.get(decision_id)
+        if old is None:
+            return None
+        new = dict(old)
+        new.update(changes)
+        _stamp_updated(new)
+        row = _decision_row(new)
+        self.conn.execute(
+            "UPDATE decisions SET hub_id = ?, block = ?, status = ?, deadline = ?, check_date = ?, "
+            "title_key = ?, body = ? WHERE id = ?",
+            row[1:] + (decision_id,),
+        )
+        self.changes.append(("update", old, new))
+        return old, new
+
+    def append_history(self, entry):
+        insert_history(self.conn, [entry])
+        self.changes.append(("history", entry))
+
+
+def _upgrade_schema(conn):
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(decisions)")}
+    if columns and "title_key" not in columns:
+        conn.execute("ALTER TABLE decisions ADD COLUMN title_key TEXT")
+        rows = conn.execute("SELECT id, body FROM decisions").fetchall()
+        conn.executemany(
+            "UPDATE decisions SET title_key = ? WHERE id = ?",
+            [(title_key(json.loads(body).get("decision")), decision_id) for decision_id, body in rows],
+        )
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "history" in tables and "history_refs" not in tables:
+        conn.execute("CREATE TABLE history_refs (decision_id TEXT NOT NULL, seq INTEGER NOT NULL)")
+        rows = conn.execute("SELECT seq, body FROM history WHERE decision_id IS NULL").fetchall()
+        conn.executemany(
+            "INSERT INTO history_refs (decision_id, seq) VALUES (?, ?)",
+            [ref for seq, body in rows for ref in history_refs(seq, json.loads(body))],
+        )
+
+
+class SqliteStore:
+    backend = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.listeners = []
+        self.history = SqliteHistory(self)
+
+    def _conn(self):
+        # Connections are per thread and must not survive a gunicorn fork.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            ensure_dir(self.path)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _upgrade_schema(conn)
+            conn.executescript(SQLITE_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _begin(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def get_meta(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def exists(self):
+        return self.get_meta("initialized") is not None
+
+    def read_meta(self, key, default=None):
+        value = self.get_meta(key)
+        return json.loads(value) if value is not None else default
+
+    def stamp(self):
+        return int(self.get_meta("version", 0))
+
+    def _bump_version(self, conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        before = int(row[0]) if row else 0
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (before + 1,))
+        return before, before + 1
+
+    def _notify(self, changes, before, after):
+        for listener in self.listeners:
+            listener(changes, before, after)
+
+    def load(self):
+        return self.load_with_stamp()[0]
+
+    def load_with_stamp(self):
+        conn = self._conn()
+        size = 0
+        with metrics.storage_seconds.time("sqlite", "load"):
+            conn.execute("BEGIN")
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                decisions = []
+                for (body,) in conn.execute("SELECT body FROM decisions ORDER BY seq"):
+                    size += len(body)
+                    decisions.append(json.loads(body))
+            finally:
+                conn.execute("COMMIT")
+        metrics.storage_bytes.observe(size, "sqlite", "load")
+        return {"decisions": decisions}, int(row[0]) if row else 0
+
+    def save(self, data):
+        with metrics.storage_seconds.time("sqlite", "save"):
+            conn = self._begin()
+            try:
+                conn.execute("DELETE FROM decisions")
+                if "history" in data:
+                    conn.execute("DELETE FROM history")
+                    conn.execute("DELETE FROM history_refs")
+                seen = set()
+                rows = []
+                for dec in data.get("decisions", []):
+                    # The JSON format never enforced unique ids; /update only ever
+                    # reached the first one, so later duplicates are dropped.
+                    if dec["id"] in seen:
+                        print(f"[storage] Duplicate decision id {dec['id']} skipped")
+                        continue
+                    seen.add(dec["id"])
+                    rows.append(_decision_row(dec))
+                # Like JsonStore.save, a whole-document save stores decisions as
+                # given: updated_at is only stamped by transactions.
+                conn.executemany(INSERT_DECISION_SQL, rows)
+                insert_history(conn, data.get("history", []))
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('initialized', '1')")
+                _, after = self._bump_version(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._notify(None, None, after)
+
+    def run(self, fn):
+        with metrics.storage_seconds.time("sqlite", "transaction"):
+            conn = self._begin()
+            try:
+                tx = SqliteTransaction(conn)
+                result = fn(tx)
+                before, after = self._bump_version(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._notify(tx.changes, before, after)
+        return result
+
+    def migrate_from_json(self, json_path):
+        """Import an existing JSON data file into an empty database once."""
+        if self.exists() or not json_path or not os.path.exists(json_path):
+            return False
+        source = JsonStore(json_path)
+        data = source.load()
+        data["history"] = data.get("history", []) + source.history.all()
+        self.save(data)
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (json_path,))
+        print(f"[storage] Migrated {json_path} -> {self.path}")
+        return True
+
+
+def open_store(path, backend="", history_rotate="month", codec=None):
+    """Pick a backend from STORAGE_BACKEND or the DATA_FILE extension.
+
+    With ``backend="sqlite"`` and a ``.json`` path the database lives next to
+    the JSON file (``decisions.json`` -> ``decisions.db``) and the JSON file is
+    migrated into it on first start.
+    """
+    root, ext = os.path.splitext(path)
+    if not backend:
+        backend = "sqlite" if ext.lower() in SQLITE_SUFFIXES else "json"
+    if backend == "json":
+        store = JsonStore(path, history_rotate, codec)
+        store.migrate_history()
+        return store
+    if backend != "sqlite":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+    if ext.lower() in SQLITE_SUFFIXES:
+        db_path, json_path = path, root + ".json"
+    else:
+        db_path, json_path = root + ".db", path
+    store = SqliteStore(db_path)
+    store.migrate_from_json(json_path)
+    return store
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+# app.py opens its store at import time; keep that one out of the working tree.
+os.environ.setdefault("DATA_FILE", os.path.join(tempfile.mkdtemp(prefix="tracker-tests-"), "decisions.json"))
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def tracker(backend, tmp_path, monkeypatch):
+    """The app module wired to an empty store of ``backend`` in ``tmp_path``."""
+    import app
+    import storage
+    from cache import DataCache, FragmentCache
+
+    store = storage.open_store(str(tmp_path / ("decisions.json" if backend == "json" else "decisions.db")))
+    store.save({"decisions": [], "history": []})
+    monkeypatch.setattr(app, "store", store)
+    monkeypatch.setattr(app, "data_cache", DataCache(store))
+    monkeypatch.setattr(app, "fragment_cache", FragmentCache(64))
+    app.app.config["TESTING"] = True
+    return app
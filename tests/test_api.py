@@ -0,0 +1,72 @@
+import json
+
+
+def seed(tracker, count=7):
+    tracker.save_data({"decisions": [
+        {"id": f"O-{n:02d}", "block": "ops", "decision": f"Решение {n}", "responsible": "Рэшад",
+         "deadline": "", "check_date": "", "status": "active", "comment": "",
+         "source": "", "tags": [], "updated_at": "2026-10-01T10:00:00"}
+        for n in range(count)
+    ]})
+
+
+def test_etag_answers_304_until_a_write(tracker):
+    seed(tracker)
+    client = tracker.app.test_client()
+
+    first = client.get("/api/decisions?status=active")
+    assert first.status_code == 200 and first.headers["Vary"] == "Accept"
+    etag = first.headers["ETag"]
+    assert client.get("/api/decisions?status=active", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/update/O-01", data={"status": "done"})
+    again = client.get("/api/decisions?status=active", headers={"If-None-Match": etag})
+    assert again.status_code == 200 and again.headers["ETag"] != etag
+    assert len(again.get_json()["decisions"]) == 6
+
+
+def test_etag_differs_between_json_and_ndjson(tracker):
+    seed(tracker)
+    client = tracker.app.test_client()
+    as_json = client.get("/api/decisions")
+    as_ndjson = client.get("/api/decisions", headers={"Accept": "application/x-ndjson"})
+    assert as_ndjson.mimetype == "application/x-ndjson"
+    assert as_json.headers["ETag"] != as_ndjson.headers["ETag"]
+    assert client.get(
+        "/api/decisions", headers={"Accept": "application/x-ndjson", "If-None-Match": as_json.headers["ETag"]}
+    ).status_code == 200
+
+
+def test_if_modified_since(tracker):
+    seed(tracker)
+    client = tracker.app.test_client()
+    last_modified = client.get("/api/decisions").headers["Last-Modified"]
+    assert client.get("/api/decisions", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get(
+        "/api/decisions", headers={"If-Modified-Since": "Thu, 01 Jan 2015 00:00:00 GMT"}
+    ).status_code == 200
+
+
+def test_cursor_walk_returns_every_decision_once(tracker):
+    seed(tracker)
+    client = tracker.app.test_client()
+    seen, cursor = [], None
+    while True:
+        url = "/api/decisions?limit=3&fields=id,status" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).get_json()
+        assert all(set(d) == {"id", "status"} for d in body["decisions"])
+        seen += [d["id"] for d in body["decisions"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == [f"O-{n:02d}" for n in range(7)]
+
+    response = client.get("/api/decisions?limit=5&format=ndjson")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 5 and response.headers["X-Next-Cursor"]
+
+
+def test_bad_limit_is_rejected(tracker):
+    client = tracker.app.test_client()
+    assert client.get("/api/decisions?limit=0").status_code == 400
+    assert client.get("/api/decisions?limit=ten").status_code == 400
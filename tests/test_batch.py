@@ -0,0 +1,68 @@
+def existing(decision_id, block, title):
+    return {"id": decision_id, "block": block, "decision": title, "responsible": "", "deadline": "",
+            "check_date": "", "status": "active", "comment": "", "source": "", "tags": []}
+
+
+def test_batch_create_and_update(tracker):
+    tracker.save_data({"decisions": [existing("O-01", "ops", "Уже есть")]})
+    client = tracker.app.test_client()
+
+    response = client.post("/api/decisions/batch", json={"decisions": [
+        {"decision": "Первое", "block": "ops"},
+        {"decision": "Второе", "block": "sales"},
+        {"decision": "Третье", "block": "ops"},
+    ]})
+    assert response.status_code == 201
+    assert [r["id"] for r in response.get_json()["results"]] == ["O-02", "P-01", "O-03"]
+
+    response = client.patch("/api/decisions/batch", json=[
+        {"id": "O-02", "status": "done"},
+        {"id": "P-01", "responsible": "Рэшад"},
+    ])
+    assert response.status_code == 200
+    decisions = {d["id"]: d for d in tracker.store.load()["decisions"]}
+    assert decisions["O-02"]["status"] == "done" and decisions["P-01"]["responsible"] == "Рэшад"
+    assert [e["action"] for e in tracker.store.history.all()] == ["batch_create", "batch_update"]
+    assert tracker.store.history.all()[1]["status_changes"] == [{"id": "O-02", "from": "active", "to": "done"}]
+
+
+def test_skip_existing_within_one_batch(tracker):
+    tracker.save_data({"decisions": [existing("O-01", "ops", "Уже есть")]})
+    response = tracker.app.test_client().post("/api/decisions/batch", json={"skip_existing": True, "decisions": [
+        {"decision": "Уже есть"},
+        {"decision": "Новое"},
+        {"decision": "новое "},
+    ]})
+    assert response.status_code == 201
+    assert [r["result"] for r in response.get_json()["results"]] == ["skipped", "created", "skipped"]
+    assert len(tracker.store.load()["decisions"]) == 2
+
+
+def test_conflict_writes_nothing(tracker):
+    tracker.save_data({"decisions": [existing("O-01", "ops", "Уже есть")]})
+    client = tracker.app.test_client()
+    before = tracker.store.load()
+
+    response = client.post("/api/decisions/batch", json=[{"decision": "Новое"}, {"id": "O-01", "decision": "Дубль"}])
+    assert response.status_code == 409
+    assert response.get_json()["results"] == [
+        {"index": 0, "result": "not_applied"},
+        {"index": 1, "result": "error", "error": "id O-01 already exists"},
+    ]
+
+    response = client.patch("/api/decisions/batch", json=[{"id": "O-01", "status": "done"}, {"id": "O-99"}])
+    assert response.status_code == 409
+    assert response.get_json()["results"][0] == {"index": 0, "result": "not_applied"}
+
+    assert tracker.store.load() == before
+    assert tracker.store.history.all() == []
+    assert client.get("/api/decisions").get_json()["decisions"] == before["decisions"]
+
+
+def test_invalid_batch_is_rejected(tracker):
+    client = tracker.app.test_client()
+    response = client.post("/api/decisions/batch", json=[{"decision": "Ок"}, {"block": "nowhere"}])
+    assert response.status_code == 400
+    assert response.get_json()["results"][0]["index"] == 1
+    assert client.post("/api/decisions/batch", json=[]).status_code == 400
+    assert tracker.store.load()["decisions"] == []
@@ -0,0 +1,21 @@
+def add_decisions(tracker, block, count):
+    tracker.save_data({"decisions": [
+        {"id": f"X-{n:03d}", "block": block, "decision": f"Решение {n}", "responsible": "", "deadline": "",
+         "check_date": "", "status": "active", "comment": "", "source": "", "tags": []}
+        for n in range(count)
+    ]})
+
+
+def test_block_sections_load_lazily_and_filtered_views_page(tracker, monkeypatch):
+    monkeypatch.setattr(tracker, "DASHBOARD_PAGE_SIZE", 5)
+    add_decisions(tracker, "ops", 12)
+    client = tracker.app.test_client()
+
+    page = client.get("/").get_data(as_text=True)
+    assert "Показать ещё (7)" in page and "Страница 1 из" not in page
+
+    page = client.get("/?block=ops").get_data(as_text=True)
+    assert "Страница 1 из 3" in page and "Показать ещё" not in page
+
+    rows = client.get("/partials/rows?block=ops&page=2").get_data(as_text=True)
+    assert "Показать ещё (2)" in rows
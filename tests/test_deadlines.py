@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+import pytest
+
+from deadlines import DeadlineIndex
+
+
+def day(offset):
+    return (date.today() + timedelta(days=offset)).isoformat()
+
+
+def decision(n, deadline="", check_date="", status="active", **fields):
+    return dict({
+        "id": f"D-{n:02d}", "block": "ops", "decision": f"Решение {n}", "responsible": "",
+        "deadline": deadline, "check_date": check_date, "status": status, "comment": "",
+        "source": "", "tags": [],
+    }, **fields)
+
+
+def deadline_flips(tracker, decision_id):
+    return [e for e in tracker.store.history.for_decision(decision_id) if e.get("source") == "deadline"]
+
+
+def test_decision_flips_once_per_date_crossing(tracker):
+    tracker.save_data({"decisions": [decision(1, deadline=day(-2), check_date=day(3)), decision(2, deadline=day(5))]})
+    client = tracker.app.test_client()
+
+    client.get("/")
+    dec = tracker.store.load()["decisions"][0]
+    assert (dec["status"], dec["overdue_for"]) == ("overdue", day(-2))
+    client.get("/")
+    assert len(deadline_flips(tracker, "D-01")) == 1
+
+    # Moved back to active without touching the passed deadline: stays active.
+    client.post("/update/D-01", data={"status": "active"})
+    client.get("/")
+    assert tracker.store.load()["decisions"][0]["status"] == "active"
+    assert len(deadline_flips(tracker, "D-01")) == 1
+
+    # A later date passing flips it again.
+    client.post("/update/D-01", data={"deadline": day(-1)})
+    client.get("/")
+    dec = tracker.store.load()["decisions"][0]
+    assert (dec["status"], dec["overdue_for"]) == ("overdue", day(-1))
+    assert len(deadline_flips(tracker, "D-01")) == 2
+    assert tracker.store.load()["decisions"][1]["status"] == "active"
+
+
+def test_failed_flip_restores_the_heap(tracker, monkeypatch):
+    tracker.save_data({"decisions": [decision(1, deadline=day(-1))]})
+    snapshot = tracker.data_cache.snapshot()
+
+    def fail(fn):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patched, pytest.raises(OSError):
+        patched.setattr(tracker, "run_tx", fail)
+        tracker.flip_overdue(snapshot)
+    assert snapshot.deadlines.has_due(day(0))
+
+    assert tracker.flip_overdue(snapshot) == 1
+    assert not snapshot.deadlines.has_due(day(0))
+
+
+def test_between_includes_both_bounds():
+    index = DeadlineIndex([
+        decision(1, deadline="2026-10-01"),
+        decision(2, deadline="2026-10-05", check_date="2026-10-03"),
+        decision(3, deadline="2026-10-07"),
+        decision(4, deadline="2026-10-04", status="done"),
+    ])
+    assert index.between("2026-10-03", "2026-10-07") == [
+        ("2026-10-03", "D-02", "check_date"),
+        ("2026-10-05", "D-02", "deadline"),
+        ("2026-10-07", "D-03", "deadline"),
+    ]
+    assert index.between("2026-10-02", "2026-10-02") == []
+
+
+def test_upcoming_views(tracker):
+    tracker.save_data({"decisions": [
+        decision(1, deadline=day(6), check_date=day(2)),
+        decision(2, deadline=day(0)),
+        decision(3, deadline=day(30)),
+        decision(4, deadline=day(1), status="done"),
+    ]})
+    client = tracker.app.test_client()
+
+    body = client.get("/api/decisions/upcoming?days=7").get_json()
+    assert [(u["decision"]["id"], u["date"], u["field"]) for u in body["upcoming"]] == [
+        ("D-02", day(0), "deadline"),
+        ("D-01", day(2), "check_date"),
+    ]
+    assert client.get("/api/decisions/upcoming?days=soon").status_code == 400
+
+    page = client.get("/?upcoming=1").get_data(as_text=True)
+    assert "Решение 1" in page and "Решение 2" in page
+    assert "Решение 3" not in page and "Решение 4" not in page
@@ -0,0 +1,77 @@
+import storage
+from history import HistoryLog
+
+
+def status_change(decision_id, timestamp, old, new):
+    return {"action": "status_change", "id": decision_id, "from": old, "to": new, "timestamp": timestamp}
+
+
+def test_for_decision_stays_in_time_order_after_compaction(tmp_path):
+    log = HistoryLog(str(tmp_path / "decisions.history"))
+    log.append([
+        status_change("O-01", "2025-01-05T10:00:00", "active", "overdue"),
+        status_change("O-01", "2025-01-06T10:00:00", "overdue", "done"),
+        status_change("O-01", "2026-10-01T10:00:00", "done", "active"),
+    ])
+    assert len(log.for_decision("O-01")) == 3
+
+    assert log.compact("2026-01-01T00:00:00") == 1
+    entries = log.for_decision("O-01")
+    assert [e["action"] for e in entries] == ["status_summary", "status_change"]
+    assert entries[0]["from"] == "active" and entries[0]["to"] == "done" and entries[0]["changes"] == 2
+    assert [e["timestamp"] for e in entries] == sorted(e["timestamp"] for e in entries)
+
+
+def test_batch_entries_are_found_for_every_decision(tmp_path):
+    entry = {
+        "action": "batch_update", "ids": ["O-01", "O-02"], "count": 2,
+        "status_changes": [{"id": "O-01", "from": "active", "to": "done"}],
+        "timestamp": "2026-10-01T10:00:00",
+    }
+    for name in ("decisions.json", "decisions.db"):
+        store = storage.open_store(str(tmp_path / name.replace(".", "_") / name))
+        store.save({"decisions": []})
+        store.run(lambda tx: tx.append_history(dict(entry)))
+        assert store.history.for_decision("O-01") == [entry]
+        assert store.history.for_decision("O-02") == [entry]
+        assert store.history.for_decision("O-03") == []
+
+
+def test_compaction_folds_batch_status_changes(tmp_path):
+    for name in ("decisions.json", "decisions.db"):
+        store = storage.open_store(str(tmp_path / name.replace(".", "_") / name))
+        store.save({"decisions": []})
+        store.history.append([
+            status_change("O-01", "2025-01-05T10:00:00", "active", "overdue"),
+            {"action": "batch_update", "ids": ["O-01", "O-02"], "count": 2,
+             "status_changes": [{"id": "O-01", "from": "overdue", "to": "done"}],
+             "timestamp": "2025-01-06T10:00:00"},
+        ])
+        assert store.history.compact("2026-01-01T00:00:00") == 1
+        entries = store.history.for_decision("O-01")
+        summary = [e for e in entries if e["action"] == "status_summary"]
+        assert len(summary) == 1
+        assert (summary[0]["from"], summary[0]["to"], summary[0]["changes"]) == ("active", "done", 2)
+        batch = [e for e in entries if e["action"] == "batch_update"]
+        assert batch and "status_changes" not in batch[0]
+        assert store.history.for_decision("O-02") == batch
+
+
+def test_recent_reads_segments_from_the_end(tmp_path, monkeypatch):
+    log = HistoryLog(str(tmp_path / "decisions.history"))
+    log.append([
+        {"action": "sync_pull" if n % 10 == 0 else "update", "id": f"O-{n:02d}", "n": n,
+         "timestamp": f"2026-{9 + n // 50:02d}-01T10:00:{n % 50:02d}"}
+        for n in range(100)
+    ])
+    # A writer is halfway through the next line.
+    with open(log._path(log.segments()[-1]), "ab") as f:
+        f.write(b'{"action": "sync_push", "n": 1')
+
+    read_backwards = log._read_backwards
+    monkeypatch.setattr(log, "_read_backwards", lambda name: read_backwards(name, chunk_size=7))
+    assert [e["n"] for e in log.recent(3)] == [99, 98, 97]
+    assert [e["n"] for e in log.recent(6, "sync_")] == [90, 80, 70, 60, 50, 40]
+    assert [e["n"] for e in log.recent(200)] == list(range(99, -1, -1))
+    assert log.last("sync_")["n"] == 90
+    assert log.last("missing") is None
@@ -0,0 +1,7 @@
+def test_worker_starts_with_a_request_not_at_import(tracker, monkeypatch):
+    assert tracker.job_worker._thread is None
+    started = []
+    monkeypatch.setattr(tracker.job_worker, "ensure_running", lambda: started.append(True))
+    monkeypatch.setitem(tracker.job_schedule, "deadline_tick", 3600)
+    tracker.app.test_client().get("/api/cache/stats")
+    assert started == [True]
@@ -0,0 +1,29 @@
+import multiprocessing
+
+import storage
+from stress_writes import COUNTER_ID, worker
+
+WORKERS = 4
+ITERATIONS = 20
+
+
+def test_concurrent_writers_lose_no_updates(backend, tmp_path):
+    path = str(tmp_path / ("decisions.json" if backend == "json" else "decisions.db"))
+    store = storage.open_store(path, backend)
+    store.save({"decisions": [{"id": COUNTER_ID, "block": "ops", "decision": "counter",
+                               "status": "active", "comment": "0"}], "history": []})
+
+    procs = [
+        multiprocessing.Process(target=worker, args=(path, backend, n, ITERATIONS))
+        for n in range(WORKERS)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=120)
+    assert [p.exitcode for p in procs] == [0] * WORKERS
+
+    decisions = store.load()["decisions"]
+    counter = next(d for d in decisions if d["id"] == COUNTER_ID)
+    assert int(counter["comment"]) == WORKERS * ITERATIONS
+    assert len({d["id"] for d in decisions}) == len(decisions) == WORKERS * ITERATIONS + 1
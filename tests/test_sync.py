@@ -0,0 +1,89 @@
+import pytest
+
+import hub
+from fakehub import FakeHub
+
+
+@pytest.fixture
+def fake_hub(tracker, monkeypatch):
+    fake = FakeHub().start()
+    monkeypatch.setattr(tracker, "hub_client", hub.HubClient(fake.url, "test-key", retries=10, backoff=0.001))
+    monkeypatch.setattr(tracker, "CONTEXT_HUB_KEY", "test-key")
+    monkeypatch.setattr(tracker, "HUB_PULL_PAGE_SIZE", 25)
+    monkeypatch.setattr(tracker, "HUB_PUSH_WORKERS", 4)
+    yield fake
+    fake.stop()
+
+
+def local_decision(n, **fields):
+    return dict({
+        "id": f"Z-{n:02d}", "block": "ops", "decision": f"Локальное решение {n}", "responsible": "Паша",
+        "deadline": "", "check_date": "", "status": "active", "comment": "", "date_created": "2026-10-01",
+        "source": "Встреча",
+    }, **fields)
+
+
+def decisions(tracker):
+    return {d["id"]: d for d in tracker.store.load()["decisions"]}
+
+
+def test_push_links_every_decision_exactly_once_despite_failures(tracker, fake_hub):
+    tracker.save_data({"decisions": [local_decision(n) for n in range(1, 31)]})
+    fake_hub.server.failure_rate = 0.2
+    for _ in range(5):
+        tracker.sync_push()
+        if all(d.get("hub_id") for d in decisions(tracker).values()):
+            break
+    fake_hub.server.failure_rate = 0
+
+    local = decisions(tracker)
+    hub_ids = [d["hub_id"] for d in local.values()]
+    assert all(hub_ids) and len(set(hub_ids)) == 30
+    assert sorted(hub_ids) == sorted(d["id"] for d in fake_hub.state.decisions)
+    # Nothing is left to push, so another sync creates nothing on the hub.
+    assert tracker.sync_push()[0] == 0
+    assert len(fake_hub.state.decisions) == 30
+
+
+def test_pull_walks_every_page_then_only_changes(tracker, fake_hub):
+    fake_hub.state.seed(60)
+    count, message = tracker.sync_pull()
+    assert count == 60, message
+    assert fake_hub.state.calls["/api/decisions"] >= 3
+    local = decisions(tracker)
+    assert sorted(d["hub_id"] for d in local.values()) == sorted(d["id"] for d in fake_hub.state.decisions)
+
+    changed = fake_hub.state.decisions[7]
+    fake_hub.state.update_decision(changed["id"], title="Переименовано в хабе")
+    calls = fake_hub.state.calls["/api/decisions"]
+    count, message = tracker.sync_pull()
+    assert count == 1, message
+    assert fake_hub.state.calls["/api/decisions"] == calls + 1
+    local = decisions(tracker)
+    assert len(local) == 60
+    assert [d["decision"] for d in local.values() if d["hub_id"] == changed["id"]] == ["Переименовано в хабе"]
+
+
+def test_push_then_pull_keeps_local_status(tracker, fake_hub):
+    tracker.save_data({"decisions": [local_decision(1, status="done"), local_decision(2, status="deferred")]})
+    assert tracker.sync_push()[0] == 2
+    tracker.sync_pull()
+    local = decisions(tracker)
+    assert (local["Z-01"]["status"], local["Z-02"]["status"]) == ("done", "deferred")
+    assert not [e for e in tracker.store.history.all() if e.get("source") == "sync_pull"]
+
+    # A status change made on the hub still wins.
+    fake_hub.state.update_decision(local["Z-02"]["hub_id"], status="archived")
+    tracker.sync_pull()
+    local = decisions(tracker)
+    assert (local["Z-01"]["status"], local["Z-02"]["status"]) == ("done", "done")
+    assert local["Z-02"]["hub_status"] == "archived"
+
+
+def test_first_pull_adopts_hub_status_of_linked_decisions(tracker, fake_hub):
+    # Linked before hub_status was recorded: the hub record is still active.
+    hub_dec = fake_hub.state.add_decision("Локальное решение 1")
+    tracker.save_data({"decisions": [local_decision(1, status="done", hub_id=hub_dec["id"])]})
+    tracker.sync_pull()
+    local = decisions(tracker)["Z-01"]
+    assert (local["status"], local["hub_status"]) == ("done", "active")